@@ -0,0 +1,185 @@
+"""
+历史论文回填模块
+
+按时间窗口和结果分页批量抓取历史论文，并写入本地存档。
+每页结果与断点在同一事务中保存，中断后可从断点继续，已完成的窗口不会重复下载。
+"""
+import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Deque, List, Optional, Tuple
+from urllib.parse import quote
+
+import metrics
+from config import Config
+from db_manager import DatabaseManager
+from feed_parser import parse_feed
+from fetcher import FetchError, classify_page, get_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+class Backfiller:
+    """历史论文回填器"""
+
+    def __init__(self, topic: Optional[str] = None, start_date: Optional[date] = None,
+                 end_date: Optional[date] = None, window_days: int = 0,
+                 page_size: int = 0, workers: int = 0):
+        """
+        初始化回填器
+
+        Args:
+            topic: 主题
+            start_date: 起始日期（含）
+            end_date: 结束日期（含，默认今天）
+            window_days: 每个时间窗口的天数（默认为BACKFILL_WINDOW_DAYS）
+            page_size: 每页论文数（默认为BACKFILL_PAGE_SIZE）
+            workers: 解析进程数（默认为BACKFILL_WORKERS）
+        """
+        self.topic = topic or Config.DEFAULT_TOPIC
+        self.end_date = end_date or date.today()
+        self.start_date = start_date or self.end_date - timedelta(days=365)
+        self.window_days = window_days or Config.BACKFILL_WINDOW_DAYS
+        self.page_size = page_size or Config.BACKFILL_PAGE_SIZE
+        self.workers = workers or Config.BACKFILL_WORKERS
+        self.api_url = Config.ARXIV_API_URL
+        self.fetcher = get_fetcher()
+        self.db = DatabaseManager()
+
+    def windows(self) -> List[Tuple[str, str]]:
+        """
+        划分时间窗口
+
+        Returns:
+            (起点, 终点)列表，格式为arXiv的YYYYMMDDHHMM
+        """
+        windows = []
+        current = self.start_date
+        while current <= self.end_date:
+            window_end = min(current + timedelta(days=self.window_days - 1), self.end_date)
+            windows.append((current.strftime('%Y%m%d') + '0000', window_end.strftime('%Y%m%d') + '2359'))
+            current = window_end + timedelta(days=1)
+        return windows
+
+    def _build_url(self, window: Tuple[str, str], start: int) -> str:
+        """构建指定窗口和起始位置的请求URL"""
+        query = f'all:{self.topic} AND submittedDate:[{window[0]} TO {window[1]}]'
+        return (f'{self.api_url}?search_query={quote(query, safe="")}'
+                f'&start={start}&max_results={self.page_size}'
+                f'&sortBy=submittedDate&sortOrder=ascending')
+
+    def run(self) -> int:
+        """
+        执行回填
+
+        Returns:
+            本次写入的论文数
+        """
+        windows = self.windows()
+        logger.info("开始回填主题: %s (%s ~ %s，共 %d 个时间窗口)",
+                    self.topic, self.start_date, self.end_date, len(windows))
+
+        stored = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for window in windows:
+                stored += self._run_window(pool, window)
+
+        logger.info("回填完成，本次共写入 %d 篇论文，存档共 %d 篇", stored, self.db.get_paper_count())
+        return stored
+
+    @staticmethod
+    def _cancel(inflight: Deque[Tuple[int, Future]]):
+        """取消尚未写入的解析任务"""
+        for _, pending in inflight:
+            pending.cancel()
+        inflight.clear()
+
+    def _run_window(self, pool: ProcessPoolExecutor, window: Tuple[str, str]) -> int:
+        """
+        回填单个时间窗口
+
+        下载与解析流水线执行：解析上一页的同时下载下一页，结果按页序写入。
+
+        Args:
+            pool: 解析进程池
+            window: 时间窗口
+
+        Returns:
+            写入的论文数
+        """
+        checkpoint = self.db.get_backfill_checkpoint(self.topic, *window)
+        if checkpoint and checkpoint[2]:
+            logger.debug("窗口 %s ~ %s 已完成，跳过", *window)
+            return 0
+
+        next_fetch, total = (checkpoint[0], checkpoint[1]) if checkpoint else (0, None)
+        if next_fetch:
+            logger.info("窗口 %s ~ %s 从第 %d 条继续", window[0], window[1], next_fetch)
+
+        stored = 0
+        inflight: Deque[Tuple[int, Future]] = deque()
+        fetch_error: Optional[FetchError] = None
+        while True:
+            if fetch_error is None and (total is None or next_fetch < total):
+                try:
+                    content = self.fetcher.fetch(self._build_url(window, next_fetch))
+                except FetchError as e:
+                    # 熔断或重试耗尽：不再下载，先按页序写入已下载的页面，断点停在失败的页面
+                    logger.error("窗口 %s ~ %s 第 %d 条起下载失败（%s）: %s",
+                                 window[0], window[1], next_fetch, e.kind, e)
+                    fetch_error = e
+                else:
+                    inflight.append((next_fetch, pool.submit(parse_feed, content)))
+                    next_fetch += self.page_size
+
+            if not inflight:
+                break
+
+            # 总数未知时需先解析第一页；否则保持不超过workers页在解析中
+            can_fetch_more = fetch_error is None and total is not None and next_fetch < total
+            if can_fetch_more and len(inflight) <= self.workers:
+                continue
+
+            page_start, future = inflight.popleft()
+            try:
+                with metrics.timed('parse_wait'):
+                    page = future.result()
+                if page.warning:
+                    logger.warning("解析feed时出现问题: %s", page.warning)
+                error = classify_page(page, page_start, self.page_size)
+            except Exception as e:
+                # 条目在中间被截断时解析进程会抛出异常
+                error = FetchError('malformed', f"无法解析feed: {type(e).__name__}: {e}")
+            if error is not None:
+                # XML损坏、响应被截断或异常空页，单独重新下载该页，通过检查后才写入断点
+                logger.warning("窗口 %s ~ %s 第 %d 条起的页面不可用（%s）: %s，重新下载",
+                               window[0], window[1], page_start, error.kind, error)
+                metrics.FETCH_FAILURES.inc(kind=error.kind)
+                try:
+                    page = self.fetcher.fetch_feed(
+                        self._build_url(window, page_start), start=page_start, page_size=self.page_size)
+                except FetchError as e:
+                    logger.error("窗口 %s ~ %s 第 %d 条起的页面不可用（%s），保留断点以便续传",
+                                 window[0], window[1], page_start, e.kind)
+                    self._cancel(inflight)
+                    if self.fetcher.circuit_open:
+                        raise
+                    break
+            papers = page.papers
+            total = page.total if total is None else total
+
+            completed = page_start + self.page_size >= total
+            with metrics.timed('db_write'):
+                self.db.save_backfill_page(self.topic, window[0], window[1], papers,
+                                           page_start + self.page_size, total, completed)
+            metrics.PAPERS_FETCHED.inc(len(papers))
+            stored += len(papers)
+            logger.info("窗口 %s ~ %s: 已写入 %d/%d", window[0], window[1],
+                        min(page_start + self.page_size, total), total)
+            if completed:
+                break
+
+        if fetch_error is not None and self.fetcher.circuit_open:
+            raise fetch_error
+        return stored
@@ -0,0 +1,6 @@
+"""
+离线性能基准测试
+
+使用本地的arXiv API与SMTP替身服务，无需访问网络。
+运行方式: python -m benchmarks.run
+"""
@@ -0,0 +1,90 @@
+"""
+冷启动基准测试
+
+在独立子进程中反复导入入口模块，统计启动耗时，并检查重量级依赖是否被提前导入。
+
+使用示例:
+  python -m benchmarks.cold_start
+  python -m benchmarks.cold_start --module scheduler --iterations 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 这些模块只应在真正需要时才导入
+HEAVY_MODULES = ('feedparser', 'schedule', 'smtplib', 'email.mime', 'urllib.request',
+                 'http.server', 'cProfile', 'concurrent.futures')
+
+
+def time_import(module: str) -> float:
+    """
+    在新进程中导入模块，返回耗时（秒，已扣除解释器本身的启动时间）
+
+    Args:
+        module: 模块名
+
+    Returns:
+        耗时（秒）
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'import {module}'], cwd=ROOT_DIR, check=True)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], cwd=ROOT_DIR, check=True)
+    return max(elapsed - (time.perf_counter() - start), 0.0)
+
+
+def import_breakdown(module: str) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """
+    使用 -X importtime 获取导入耗时明细
+
+    Args:
+        module: 模块名
+
+    Returns:
+        (按累计耗时排序的(模块, 微秒)列表, 被提前导入的重量级模块列表)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT_DIR, check=True, capture_output=True, text=True)
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cum, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cum)
+    heavy = sorted({name for name in cumulative
+                    for prefix in HEAVY_MODULES if name == prefix or name.startswith(prefix + '.')})
+    return sorted(cumulative.items(), key=lambda item: item[1], reverse=True), heavy
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='冷启动导入耗时基准测试')
+    _ = parser.add_argument('-m', '--module', action='append',
+                            help='要测试的模块（可多次指定，默认main、scheduler、db_manager）')
+    _ = parser.add_argument('--iterations', type=int, default=10, help='每个模块的测试次数')
+    _ = parser.add_argument('--top', type=int, default=10, help='输出耗时最多的前N个导入')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.module or ['main', 'scheduler', 'db_manager']:
+        samples = sorted(time_import(module) for _ in range(args.iterations))
+        breakdown, heavy = import_breakdown(module)
+        print(f"\n{module}: p50 {samples[len(samples) // 2] * 1000:.1f}ms, "
+              f"min {samples[0] * 1000:.1f}ms, max {samples[-1] * 1000:.1f}ms")
+        for name, micros in breakdown[:args.top]:
+            print(f"  {micros / 1000:>8.1f}ms  {name}")
+        if heavy:
+            failed = True
+            print(f"  提前导入了重量级模块: {', '.join(heavy)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+本地arXiv API替身服务
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+CATEGORIES = ['cs.LG', 'cs.AI', 'cs.CL', 'cs.CV', 'stat.ML', 'cs.NE', 'math.OC']
+SURNAMES = ['Wang', 'Li', 'Zhang', 'Smith', 'Müller', 'García', 'Kim', 'Nguyen', 'Rossi', 'Ivanov']
+
+
+def build_entry(index: int, abstract_words: int = 150) -> str:
+    """
+    生成一条Atom条目
+
+    Args:
+        index: 论文序号（决定arXiv ID和内容）
+        abstract_words: 摘要单词数
+
+    Returns:
+        XML文本
+    """
+    arxiv_id = f'{2400 + index // 100000:04d}.{index % 100000:05d}v1'
+    published = (datetime(2024, 1, 1) + timedelta(minutes=index)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    authors = ''.join(
+        f'<author><name>Author{(index + k) % 97} {SURNAMES[(index + k) % len(SURNAMES)]}</name></author>'
+        for k in range(1 + index % 5)
+    )
+    categories = ''.join(
+        f'<category term="{CATEGORIES[(index + k) % len(CATEGORIES)]}" scheme="http://arxiv.org/schemas/atom"/>'
+        for k in range(1 + index % 3)
+    )
+    abstract = ' '.join(f'word{(index * 7 + k) % 1000}' for k in range(abstract_words))
+    return (
+        '<entry>'
+        f'<id>http://arxiv.org/abs/{arxiv_id}</id>'
+        f'<updated>{published}</updated><published>{published}</published>'
+        f'<title>{escape(f"Synthetic paper {index} on learning & optimization")}</title>'
+        f'<summary>{escape(abstract)}</summary>'
+        f'{authors}'
+        f'<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>'
+        f'{categories}'
+        '</entry>'
+    )
+
+
+def build_feed(start: int, count: int, total: int, abstract_words: int = 150) -> bytes:
+    """
+    生成一页Atom feed
+
+    Args:
+        start: 起始序号
+        count: 条目数
+        total: 结果总数
+        abstract_words: 摘要单词数
+
+    Returns:
+        feed内容
+    """
+    entries = ''.join(build_entry(i, abstract_words) for i in range(start, start + count))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        '<title type="html">ArXiv Query</title>'
+        f'<opensearch:totalResults>{total}</opensearch:totalResults>'
+        f'<opensearch:startIndex>{start}</opensearch:startIndex>'
+        f'<opensearch:itemsPerPage>{count}</opensearch:itemsPerPage>'
+        f'{entries}'
+        '</feed>'
+    ).encode('utf-8')
+
+
+class FakeArxivServer:
+    """本地arXiv API替身服务"""
+
+    def __init__(self, total: int = 10000, latency: float = 0.0, page_cap: int = 2000,
+                 drift: int = 0, abstract_words: int = 150):
+        """
+        初始化替身服务
+
+        Args:
+            total: 结果总数
+            latency: 每次请求的附加延迟（秒）
+            page_cap: 单页最多返回条目数
+            drift: 每次请求后新出现的论文数（模拟新论文不断发布）
+            abstract_words: 摘要单词数
+        """
+        self.total = total
+        self.latency = latency
+        self.page_cap = page_cap
+        self.drift = drift
+        self.abstract_words = abstract_words
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """API地址"""
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/api/query'
+
+    def _respond(self, query: str) -> bytes:
+        params = parse_qs(query)
+        start = int(params.get('start', ['0'])[0])
+        max_results = int(params.get('max_results', ['10'])[0])
+        with self._lock:
+            offset = self.request_count * self.drift
+            self.request_count += 1
+        count = max(0, min(max_results, self.page_cap, self.total - start))
+        return build_feed(start + offset, count, self.total, self.abstract_words)
+
+    def start(self) -> 'FakeArxivServer':
+        """在后台线程中启动服务"""
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                body = fake._respond(urlparse(self.path).query)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/atom+xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self._server.serve_forever, name='fake-arxiv', daemon=True).start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
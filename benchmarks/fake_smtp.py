@@ -0,0 +1,102 @@
+"""
+本地SMTP替身服务
+
+只实现smtplib发送邮件所需的最小命令集（不支持STARTTLS）。
+"""
+import socketserver
+import threading
+from typing import Optional
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """SMTP会话处理"""
+
+    def _reply(self, line: str):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self._reply('220 fake-smtp ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self._reply('250-fake-smtp')
+                self._reply('250-AUTH PLAIN LOGIN')
+                self._reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self._reply('250 fake-smtp')
+            elif verb == 'AUTH':
+                self._reply('235 2.7.0 Authentication successful')
+            elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data)
+                self.server.record_message(size)  # type: ignore[attr-defined]
+                self._reply('250 OK queued')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.message_count = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def record_message(self, size: int):
+        with self._lock:
+            self.message_count += 1
+            self.bytes_received += size
+
+
+class FakeSMTPServer:
+    """本地SMTP替身服务"""
+
+    def __init__(self):
+        self._server: Optional[_Server] = None
+
+    @property
+    def host(self) -> str:
+        """监听地址"""
+        assert self._server is not None
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        """监听端口"""
+        assert self._server is not None
+        return self._server.server_address[1]
+
+    @property
+    def message_count(self) -> int:
+        """已接收的邮件数"""
+        return self._server.message_count if self._server else 0
+
+    def start(self) -> 'FakeSMTPServer':
+        """在后台线程中启动服务"""
+        self._server = _Server(('127.0.0.1', 0), _SMTPHandler)
+        threading.Thread(target=self._server.serve_forever, name='fake-smtp', daemon=True).start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
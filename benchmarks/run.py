@@ -0,0 +1,352 @@
+"""
+离线性能基准测试入口
+
+使用示例:
+  # 运行全部基准测试，并与已保存的基线比较
+  python -m benchmarks.run
+
+  # 保存当前结果为基线
+  python -m benchmarks.run --save-baseline
+
+  # 只运行指定场景，模拟每次请求50ms延迟
+  python -m benchmarks.run -s fetch_papers -s send_email --latency 0.05
+
+每个场景在独立的子进程中运行，峰值内存互不影响。
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fake_arxiv import FakeArxivServer
+from benchmarks.fake_smtp import FakeSMTPServer
+from config import Config
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class BenchResult:
+    """单个场景的测试结果"""
+    name: str
+    items: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    peak_rss_kb: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, float]:
+        """导出为字典"""
+        return {
+            'iterations': len(self.latencies),
+            'items': self.items,
+            'throughput': round(self.items / self.elapsed, 2) if self.elapsed > 0 else 0.0,
+            'p50_ms': round(percentile(self.latencies, 50) * 1000, 3),
+            'p99_ms': round(percentile(self.latencies, 99) * 1000, 3),
+            'peak_rss_kb': self.peak_rss_kb or 0,
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 样本
+        pct: 百分位（0~100）
+
+    Returns:
+        百分位数
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """获取进程峰值常驻内存（KB），该值只增不减，因此每个场景在独立进程中运行"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+
+def measure(name: str, iterations: int, func: Callable[[], int]) -> BenchResult:
+    """
+    重复执行函数并记录耗时
+
+    Args:
+        name: 场景名称
+        iterations: 执行次数
+        func: 被测函数，返回本次处理的条目数
+
+    Returns:
+        测试结果
+    """
+    result = BenchResult(name)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        result.items += func()
+        result.latencies.append(time.perf_counter() - t0)
+    result.elapsed = time.perf_counter() - start
+    result.peak_rss_kb = peak_rss_kb()
+    return result
+
+
+def _fresh_db(workdir: str, name: str):
+    """为场景准备独立的数据库文件"""
+    Config.DB_FILE = os.path.join(workdir, f'{name}.db')
+
+
+def bench_fetch_papers(args, arxiv: FakeArxivServer, smtp: FakeSMTPServer, workdir: str) -> BenchResult:
+    """ArxivCrawler.fetch_papers：单页下载、解析与去重"""
+    from crawler import ArxivCrawler
+
+    _fresh_db(workdir, 'fetch_papers')
+    arxiv.drift = 0
+    crawler = ArxivCrawler('benchmark')
+    return measure('fetch_papers', args.iterations,
+                   lambda: len(crawler.fetch_papers(max_results=args.page_size, check_duplicate=True)))
+
+
+def bench_crawl_until_enough(args, arxiv: FakeArxivServer, smtp: FakeSMTPServer, workdir: str) -> BenchResult:
+    """ArxivCrawler.crawl_until_enough：多轮爬取直到找到足够的新论文"""
+    from crawler import ArxivCrawler
+
+    _fresh_db(workdir, 'crawl_until_enough')
+    arxiv.drift = args.page_size // 2
+    Config.CRAWL_RESULTS = args.page_size
+    crawler = ArxivCrawler('benchmark')
+    target = args.page_size * args.rounds // 2
+    return measure('crawl_until_enough', max(1, args.iterations // args.rounds),
+                   lambda: len(crawler.crawl_until_enough(target_count=target, max_rounds=args.rounds)))
+
+
+def bench_send_email(args, arxiv: FakeArxivServer, smtp: FakeSMTPServer, workdir: str) -> BenchResult:
+    """EmailNotifier.send_email：渲染邮件并通过SMTP发送"""
+    from crawler import ArxivCrawler
+    from email_notifier import EmailNotifier
+
+    _fresh_db(workdir, 'send_email')
+    arxiv.drift = 0
+    papers = ArxivCrawler('benchmark').fetch_papers(max_results=Config.MAX_PAPERS_PER_DAY)
+    notifier = EmailNotifier()
+
+    def send() -> int:
+        return len(papers) if notifier.send_email(papers, 'benchmark') else 0
+
+    return measure('send_email', args.iterations, send)
+
+
+def bench_crawl_and_notify(args, arxiv: FakeArxivServer, smtp: FakeSMTPServer, workdir: str) -> BenchResult:
+    """PaperScheduler.crawl_and_notify：完整任务（爬取、去重、发送、记录）"""
+    from scheduler import PaperScheduler
+
+    _fresh_db(workdir, 'crawl_and_notify')
+    arxiv.drift = Config.MAX_PAPERS_PER_DAY
+    Config.CRAWL_RESULTS = args.page_size
+    scheduler = PaperScheduler('benchmark')
+
+    def run() -> int:
+        sent_before = smtp.message_count
+        scheduler.crawl_and_notify()
+        scheduler.crawler.dedup.flush()  # 发送记录的写回计入本次耗时
+        return Config.MAX_PAPERS_PER_DAY if smtp.message_count > sent_before else 0
+
+    return measure('crawl_and_notify', args.iterations, run)
+
+
+def bench_cold_start(args, arxiv: FakeArxivServer, smtp: FakeSMTPServer, workdir: str) -> BenchResult:
+    """main.py冷启动：在新进程中导入入口模块"""
+    from benchmarks.cold_start import time_import
+
+    result = BenchResult('cold_start')
+    for _ in range(args.iterations):
+        result.latencies.append(time_import('main'))
+        result.items += 1
+    result.elapsed = sum(result.latencies)
+    result.peak_rss_kb = peak_rss_kb()
+    return result
+
+
+SCENARIOS: Dict[str, Callable[..., BenchResult]] = {
+    'fetch_papers': bench_fetch_papers,
+    'crawl_until_enough': bench_crawl_until_enough,
+    'send_email': bench_send_email,
+    'crawl_and_notify': bench_crawl_and_notify,
+    'cold_start': bench_cold_start,
+}
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                          tolerance: float) -> List[str]:
+    """
+    与基线比较
+
+    Args:
+        results: 本次结果
+        baseline: 基线结果
+        tolerance: 允许的性能下降比例
+
+    Returns:
+        性能回退描述列表
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base['throughput'] and current['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: 吞吐量 {current['throughput']} < 基线 {base['throughput']}")
+        if base['p99_ms'] and current['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {current['p99_ms']}ms > 基线 {base['p99_ms']}ms")
+        if base.get('peak_rss_kb') and current['peak_rss_kb'] > base['peak_rss_kb'] * (1 + tolerance):
+            regressions.append(f"{name}: 峰值内存 {current['peak_rss_kb']}KB > 基线 {base['peak_rss_kb']}KB")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, float]]):
+    """输出结果表"""
+    header = f"{'scenario':<22}{'iters':>7}{'items':>9}{'items/s':>12}{'p50(ms)':>11}{'p99(ms)':>11}{'peakRSS(KB)':>13}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        print(f"{name:<22}{r['iterations']:>7}{r['items']:>9}{r['throughput']:>12.1f}"
+              f"{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}{r['peak_rss_kb']:>13}")
+
+
+def run_scenarios(args, names: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    在当前进程中启动替身服务并运行场景
+
+    Args:
+        args: 命令行参数
+        names: 场景名称列表
+
+    Returns:
+        各场景的结果
+    """
+    arxiv = FakeArxivServer(total=args.total, latency=args.latency, page_cap=args.page_cap,
+                            abstract_words=args.abstract_words).start()
+    smtp = FakeSMTPServer().start()
+
+    Config.ARXIV_API_URL = arxiv.url
+    Config.REQUEST_DELAY = args.request_delay
+    Config.SMTP_SERVER = smtp.host
+    Config.SMTP_PORT = smtp.port
+    Config.SMTP_USE_TLS = False
+    Config.SENDER_EMAIL = 'bench@example.com'
+    Config.SENDER_PASSWORD = 'benchmark'
+    Config.RECEIVER_EMAIL = 'receiver@example.com'
+    Config.METRICS_JSON_FILE = ''
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix='arxiv-bench-') as workdir:
+            for name in names:
+                results[name] = SCENARIOS[name](args, arxiv, smtp, workdir).to_dict()
+    finally:
+        arxiv.stop()
+        smtp.stop()
+    return results
+
+
+def run_in_subprocess(args, name: str) -> Dict[str, float]:
+    """
+    在独立的子进程中运行单个场景，使峰值内存只反映该场景
+
+    Args:
+        args: 命令行参数
+        name: 场景名称
+
+    Returns:
+        场景结果
+    """
+    cmd = [sys.executable, '-m', 'benchmarks.run', '--worker', '-s', name,
+           '--iterations', str(args.iterations), '--page-size', str(args.page_size),
+           '--page-cap', str(args.page_cap), '--rounds', str(args.rounds), '--total', str(args.total),
+           '--latency', str(args.latency), '--abstract-words', str(args.abstract_words),
+           '--request-delay', str(args.request_delay)]
+    proc = subprocess.run(cmd, cwd=ROOT_DIR, stdout=subprocess.PIPE, check=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])[name]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='arXiv论文爬虫离线基准测试')
+    _ = parser.add_argument('-s', '--scenario', action='append', choices=list(SCENARIOS),
+                            help='要运行的场景（可多次指定，默认全部）')
+    _ = parser.add_argument('--iterations', type=int, default=20, help='每个场景的执行次数')
+    _ = parser.add_argument('--page-size', type=int, default=100, help='每页论文数')
+    _ = parser.add_argument('--page-cap', type=int, default=2000, help='替身API单页最多返回的论文数')
+    _ = parser.add_argument('--rounds', type=int, default=5, help='crawl_until_enough的最大轮数')
+    _ = parser.add_argument('--total', type=int, default=100000, help='替身API的结果总数')
+    _ = parser.add_argument('--latency', type=float, default=0.0, help='替身API每次请求的附加延迟（秒）')
+    _ = parser.add_argument('--abstract-words', type=int, default=150, help='每篇论文摘要的单词数')
+    _ = parser.add_argument('--request-delay', type=float, default=0.0,
+                            help='爬虫请求间隔（秒），默认0以排除频率限制等待')
+    _ = parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件路径')
+    _ = parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为基线')
+    _ = parser.add_argument('--tolerance', type=float, default=0.25, help='允许的性能下降比例')
+    _ = parser.add_argument('--output', help='将本次结果写入JSON文件')
+    _ = parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    names = args.scenario or list(SCENARIOS)
+
+    if args.worker:
+        # 子进程：在当前进程中运行场景，结果以JSON输出到stdout
+        print(json.dumps(run_scenarios(args, names)))
+        return 0
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name in names:
+        results[name] = run_in_subprocess(args, name)
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n基线已保存: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\n未找到基线文件，可使用 --save-baseline 保存")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    if regressions:
+        print("\n检测到性能回退:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\n与基线相比未发现性能回退")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
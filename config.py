@@ -13,6 +13,7 @@ class Config:
     # 邮箱配置
     SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
     SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes')  # 是否启用STARTTLS
     SENDER_EMAIL = os.getenv('SENDER_EMAIL', '')
     SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', '')
     RECEIVER_EMAIL = os.getenv('RECEIVER_EMAIL', '')
@@ -23,14 +24,48 @@ class Config:
     CRAWL_RESULTS = int(os.getenv('CRAWL_RESULTS', '50'))  # 每次爬取的论文总数（用于筛选新论文）
     CRAWL_INTERVAL_DAYS = int(os.getenv('CRAWL_INTERVAL_DAYS', '1'))  # 查询最近几天的论文
     MAX_CRAWL_ROUNDS = int(os.getenv('MAX_CRAWL_ROUNDS', '15'))  # 最大爬取轮数
+    DIGEST_CATEGORIES = [c.strip() for c in os.getenv('DIGEST_CATEGORIES', '').split(',') if c.strip()]  # 只发送这些分类的论文，为空表示不过滤
+    WATCH_AUTHORS = [a.strip() for a in os.getenv('WATCH_AUTHORS', '').split(',') if a.strip()]  # 关注的作者，其论文总会被发送
+    WATCH_LOOKBACK_DAYS = int(os.getenv('WATCH_LOOKBACK_DAYS', '30'))  # 从本地存档补发关注作者论文的时间范围（天）
 
     # arXiv API配置
-    ARXIV_API_URL = 'http://export.arxiv.org/api/query'
+    ARXIV_API_URL = os.getenv('ARXIV_API_URL', 'http://export.arxiv.org/api/query')
     REQUEST_DELAY = 3  # 请求间隔（秒），遵守arXiv API限制
     MAX_RESULTS = 20  # 每次请求最多返回结果数
+    REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))  # 单次请求超时（秒）
+    REQUEST_DELAY_MAX = int(os.getenv('REQUEST_DELAY_MAX', '60'))  # 遇到限流后请求间隔的上限（秒）
+    FETCH_MAX_RETRIES = int(os.getenv('FETCH_MAX_RETRIES', '4'))  # 单次请求失败后的最大重试次数
+    FETCH_BACKOFF_BASE = float(os.getenv('FETCH_BACKOFF_BASE', '2'))  # 指数退避基数（秒）
+    FETCH_BACKOFF_MAX = float(os.getenv('FETCH_BACKOFF_MAX', '60'))  # 单次退避最长等待（秒）
+    BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', '5'))  # 连续失败多少次后熔断
+    BREAKER_COOLDOWN = int(os.getenv('BREAKER_COOLDOWN', '300'))  # 熔断持续时间（秒）
 
  # 数据库配置
     DB_FILE = 'papers.db'  # SQLite数据库文件路径
+    DEDUP_FLUSH_SIZE = int(os.getenv('DEDUP_FLUSH_SIZE', '100'))  # 待写回的发送记录达到该数量时立即写入数据库
+    DEDUP_FLUSH_INTERVAL = float(os.getenv('DEDUP_FLUSH_INTERVAL', '5'))  # 发送记录最多延迟多久写入数据库（秒），0表示立即写入
+
+    # 历史回填配置
+    BACKFILL_WINDOW_DAYS = int(os.getenv('BACKFILL_WINDOW_DAYS', '30'))  # 每个时间窗口的天数
+    BACKFILL_PAGE_SIZE = int(os.getenv('BACKFILL_PAGE_SIZE', '500'))  # 每页论文数（arXiv单次最多2000）
+    BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', '2'))  # 解析进程数
+
+    # 导出配置
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '10000'))  # 导出时每块读取的行数
+
+    # 周报/月报汇总配置
+    ROLLUP_PER_GROUP = int(os.getenv('ROLLUP_PER_GROUP', '5'))  # 每组展示的论文数
+    ROLLUP_MAX_GROUPS = int(os.getenv('ROLLUP_MAX_GROUPS', '10'))  # 最多展示的分组数
+
+    # 日志与指标配置
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # 指标HTTP服务端口，0表示不启动
+    METRICS_JSON_FILE = os.getenv('METRICS_JSON_FILE', 'metrics.json')  # 每次任务结束后写入的指标文件，留空则不写入
+
+    # 性能剖析配置
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # 被剖析的任务比例（0~1），0表示仅在--profile时剖析
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'sampling')  # 剖析方式：sampling或cprofile
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')  # 剖析结果输出目录
     
     @classmethod
     def validate(cls):
@@ -1,84 +1,68 @@
 """
 arXiv爬虫模块
 """
-import time
-import feedparser
-import sqlite3
-from typing import List, Optional, Set
+import logging
+from typing import List, Optional
 from datetime import datetime, timedelta
 from urllib.parse import quote
+import metrics
 from config import Config
+from db_manager import DatabaseManager, normalize_author
+from dedup import get_dedup_service
+from fetcher import CircuitOpenError, FetchError, get_fetcher
 from models import Paper
 
+logger = logging.getLogger(__name__)
+
 
 class ArxivCrawler:
     """arXiv论文爬虫"""
 
-    def __init__(self, topic: Optional[str] = None):
+    def __init__(self, topic: Optional[str] = None, categories: Optional[List[str]] = None,
+                 watch_authors: Optional[List[str]] = None):
         """
         初始化爬虫
 
         Args:
             topic: 爬取主题
+            categories: 只保留这些分类的论文（默认为DIGEST_CATEGORIES，为空表示不过滤）
+            watch_authors: 关注的作者，其论文总会被保留并优先发送（默认为WATCH_AUTHORS）
         """
         self.topic = topic or Config.DEFAULT_TOPIC
+        self.categories = Config.DIGEST_CATEGORIES if categories is None else categories
+        self.watch_authors = Config.WATCH_AUTHORS if watch_authors is None else watch_authors
+        self.watch_keys = {normalize_author(author) for author in self.watch_authors}
         self.api_url = Config.ARXIV_API_URL
-        self.request_delay = Config.REQUEST_DELAY
+        self.fetcher = get_fetcher()  # 进程内共享频率限制与熔断状态
         self.max_results = Config.MAX_RESULTS
-        self.sent_paper_ids: Set[str] = set()  # 已发送的论文ID集合
-
-        # 初始化数据库
-        self._init_database()
-        self._load_sent_papers()
-
-    def _init_database(self):
-        """初始化数据库"""
-        conn = sqlite3.connect(Config.DB_FILE)
-        cursor = conn.cursor()
-
-        # 创建已发送论文表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sent_papers (
-                arxiv_id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                sent_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        self.dedup = get_dedup_service()  # 进程内共享已发送记录
+        self.db: Optional[DatabaseManager] = None  # 数据库在首次使用时才初始化
 
-        conn.commit()
-        conn.close()
+    def _ensure_db(self):
+        """首次使用时初始化数据库"""
+        if self.db is None:
+            self.db = DatabaseManager()
 
-    def _load_sent_papers(self):
-        """加载已发送的论文ID"""
-        try:
-            conn = sqlite3.connect(Config.DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute('SELECT arxiv_id FROM sent_papers')
-            self.sent_paper_ids = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            print(f"已加载 {len(self.sent_paper_ids)} 条历史记录")
-        except Exception as e:
-            print(f"加载历史记录失败: {str(e)}")
+    def is_paper_sent(self, arxiv_id: str) -> bool:
+        """检查论文是否已发送（或正被其他爬虫发送）"""
+        return self.dedup.is_sent(arxiv_id, owner=self)
 
-    def _save_sent_paper(self, paper: Paper):
-        """保存已发送的论文到数据库"""
-        try:
-            conn = sqlite3.connect(Config.DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR IGNORE INTO sent_papers (arxiv_id, title)
-                VALUES (?, ?)
-            ''', (paper.arxiv_id, paper.title))
-            conn.commit()
-            conn.close()
-            self.sent_paper_ids.add(paper.arxiv_id)
-        except Exception as e:
-            print(f"保存论文记录失败: {str(e)}")
+    def claim_papers(self, papers: List[Paper], limit: int = 0) -> List[Paper]:
+        """
+        认领准备发送的论文，已发送或已被其他爬虫认领的论文会被跳过
 
+        Args:
+            papers: 候选论文
+            limit: 最多认领数量（0表示不限）
 
-    def is_paper_sent(self, arxiv_id: str) -> bool:
-        """检查论文是否已发送"""
-        return arxiv_id in self.sent_paper_ids
+        Returns:
+            认领成功的论文
+        """
+        return self.dedup.claim(papers, owner=self, limit=limit)
+
+    def release_papers(self, papers: List[Paper]):
+        """释放未能发送的论文，供后续任务重新认领"""
+        self.dedup.release(papers, owner=self)
 
     def _build_query(self, days: int = 1) -> str:
         """
@@ -113,71 +97,86 @@ class ArxivCrawler:
         encoded_query = quote(query, safe='')
         url = f'{self.api_url}?search_query={encoded_query}&start=0&max_results={max_results}'
 
-        print(f"正在爬取主题: {self.topic} (最近{days}天的论文)...")
-        print(f"查询URL: {url}")
+        logger.info("正在爬取主题: %s (最近%d天的论文)...", self.topic, days)
+        logger.debug("查询URL: %s", url)
 
         try:
-            # 解析RSS feed
-            feed = feedparser.parse(url)
+            # 下载并解析RSS feed（失败时自动重试，请求频率由fetcher控制）
+            page = self.fetcher.fetch_feed(url)
+            parsed_papers = page.papers
+
+            if page.warning:
+                logger.warning("解析feed时出现问题: %s", page.warning)
 
-            if feed.bozo:
-                print(f"警告: 解析feed时出现问题: {feed.bozo_exception}")
+            metrics.PAPERS_FETCHED.inc(len(parsed_papers))
+            self._archive_papers(parsed_papers)
 
             papers = []
             new_papers = []
             duplicate_count = 0
 
-            for entry in feed.entries:
-                # 提取作者（确保都是字符串类型）
-                authors = []
-                if 'authors' in entry:
-                    authors = [str(author.name) for author in entry.authors]
-                elif 'author' in entry:
-                    authors = [str(entry.author)]
-
-                # 提取arXiv ID（确保id是字符串类型）
-                entry_id = str(entry.id)
-                arxiv_id = entry_id.split('/')[-1]
-
-                # 提取分类（确保都是字符串类型）
-                tags = []
-                if 'tags' in entry:
-                    tags = [str(tag.term) for tag in entry.tags]
-
-                # 解析发布时间（确保published是字符串类型）
-                published_str = str(entry.published)
-                published = datetime.strptime(published_str, '%Y-%m-%dT%H:%M:%SZ')
-
-                # 创建论文对象（确保所有字符串字段都是str类型）
-                paper = Paper(
-                    title=str(entry.title),
-                    authors=authors,
-                    abstract=str(entry.summary),
-                    published=published,
-                    url=str(entry.link),
-                    arxiv_id=arxiv_id,
-                    categories=tags
-                )
-
-                # 检查重复
-                if check_duplicate and self.is_paper_sent(arxiv_id):
-                    duplicate_count += 1
-                    continue
-
-                new_papers.append(paper)
-                papers.append(paper)
-
-            print(f"成功获取 {len(papers)} 篇论文 (新增 {len(new_papers)} 篇, 跳过 {duplicate_count} 篇重复)")
-
-            # 控制爬取频率
-            time.sleep(self.request_delay)
+            with metrics.timed('dedup'):
+                for paper in parsed_papers:
+                    # 检查重复
+                    if check_duplicate and self.is_paper_sent(paper.arxiv_id):
+                        duplicate_count += 1
+                        continue
+
+                    new_papers.append(paper)
+                    papers.append(paper)
+
+            logger.info("成功获取 %d 篇论文 (新增 %d 篇, 跳过 %d 篇重复)",
+                        len(papers), len(new_papers), duplicate_count)
 
             return papers
 
+        except CircuitOpenError as e:
+            logger.warning("跳过爬取: %s", e)
+            return []
+        except FetchError as e:
+            logger.error("爬取失败（%s）: %s", e.kind, e)
+            return []
         except Exception as e:
-            print(f"爬取失败: {str(e)}")
+            logger.error("爬取失败: %s", e)
             return []
 
+    def _archive_papers(self, papers: List[Paper]):
+        """将爬取到的论文写入本地存档，并更新分类与作者索引"""
+        if not papers:
+            return
+        self._ensure_db()
+        try:
+            with metrics.timed('db_write'):
+                self.db.save_papers(papers, self.topic)
+        except Exception as e:
+            logger.error("保存论文存档失败: %s", e)
+
+    def _filter_papers(self, papers: List[Paper]) -> List[Paper]:
+        """
+        按分类与关注作者过滤论文
+
+        直接检查本轮爬取到的论文字段，不依赖存档写入是否成功。
+        """
+        if not self.categories or not papers:
+            return papers
+        categories = set(self.categories)
+        return [paper for paper in papers
+                if categories.intersection(paper.categories)
+                or any(normalize_author(author) in self.watch_keys for author in paper.authors)]
+
+    def _watched_papers(self) -> List[Paper]:
+        """从本地存档中查找关注作者尚未发送的近期论文"""
+        if not self.watch_authors:
+            return []
+        self._ensure_db()
+        since = datetime.now() - timedelta(days=Config.WATCH_LOOKBACK_DAYS)
+        with metrics.timed('index_lookup'):
+            papers = self.db.find_papers(authors=self.watch_authors, since=since, unsent_only=True)
+        papers = [paper for paper in papers if not self.is_paper_sent(paper.arxiv_id)]
+        if papers:
+            logger.info("本地存档中有 %d 篇关注作者的未发送论文", len(papers))
+        return papers
+
     def mark_papers_sent(self, papers: List[Paper]):
         """
         标记论文为已发送
@@ -185,10 +184,11 @@ class ArxivCrawler:
         Args:
             papers: 论文列表
         """
-        for paper in papers:
-            self._save_sent_paper(paper)
-        print(f"已标记 {len(papers)} 篇论文为已发送")
-        #test
+        try:
+            self.dedup.mark_sent(papers, self.topic)
+            logger.info("已标记 %d 篇论文为已发送", len(papers))
+        except Exception as e:
+            logger.error("保存论文记录失败: %s", e)
 
     def crawl_with_limit(self, max_papers: int = 10) -> List[Paper]:
         """
@@ -217,12 +217,13 @@ class ArxivCrawler:
         target_count = target_count or Config.MAX_PAPERS_PER_DAY
         max_rounds = max_rounds or Config.MAX_CRAWL_ROUNDS
 
-        all_new_papers = []
-        seen_ids = set()  # 本次爬取中已看到的论文ID，避免重复
+        # 关注作者的论文优先
+        all_new_papers = self._watched_papers()
+        seen_ids = {paper.arxiv_id for paper in all_new_papers}  # 本次爬取中已看到的论文ID，避免重复
         round_num = 0  # 初始化轮数
 
         for round_num in range(1, max_rounds + 1):
-            print(f"\n--- 第 {round_num} 轮爬取 ---")
+            logger.info("--- 第 %d 轮爬取 ---", round_num)
 
             # 爬取论文
             papers = self.fetch_papers(
@@ -231,28 +232,34 @@ class ArxivCrawler:
             )
 
             if not papers:
-                print("本轮未获取到论文")
+                if self.fetcher.circuit_open:
+                    logger.warning("arXiv API暂不可用，停止本次爬取")
+                    break
+                logger.info("本轮未获取到论文")
                 continue
 
             # 过滤出本次爬取中的新论文（不在seen_ids中，也不在数据库中）
             round_new_papers = []
-            for paper in papers:
-                if paper.arxiv_id not in seen_ids and not self.is_paper_sent(paper.arxiv_id):
-                    round_new_papers.append(paper)
-                    seen_ids.add(paper.arxiv_id)
+            with metrics.timed('dedup'):
+                for paper in papers:
+                    if paper.arxiv_id not in seen_ids and not self.is_paper_sent(paper.arxiv_id):
+                        round_new_papers.append(paper)
+                        seen_ids.add(paper.arxiv_id)
+
+            # 按分类过滤（关注作者的论文总会保留）
+            round_new_papers = self._filter_papers(round_new_papers)
 
-            print(f"本轮获取 {len(papers)} 篇论文，新增 {len(round_new_papers)} 篇")
+            logger.info("本轮获取 %d 篇论文，新增 %d 篇", len(papers), len(round_new_papers))
 
             # 将本轮新论文添加到总列表
             all_new_papers.extend(round_new_papers)
 
             # 检查是否达到目标
             if len(all_new_papers) >= target_count:
-                print(f"\n已达到目标数量 {target_count} 篇新论文")
+                logger.info("已达到目标数量 %d 篇新论文", target_count)
                 break
 
-        print(f"\n=== 爬取完成 ===")
-        print(f"共进行 {round_num} 轮爬取")
-        print(f"总共找到 {len(all_new_papers)} 篇新论文")
+        logger.info("=== 爬取完成 === 共进行 %d 轮爬取，总共找到 %d 篇新论文",
+                    round_num, len(all_new_papers))
 
         return all_new_papers
@@ -1,10 +1,33 @@
 """
 数据库管理工具
 """
+import json
+import logging
+import re
 import sqlite3
+import unicodedata
 from datetime import datetime
-from typing import List, Any
+from typing import Iterable, Iterator, List, Any, Optional, Set, Tuple
 from config import Config
+from models import Paper
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_author(name: str) -> str:
+    """
+    规范化作者姓名，用于索引与查询（忽略大小写、重音符号和标点）
+
+    Args:
+        name: 作者姓名
+
+    Returns:
+        规范化后的姓名
+    """
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[.,\-]', ' ', text.lower())
+    return ' '.join(text.split())
 
 
 class DatabaseManager:
@@ -30,8 +53,388 @@ class DatabaseManager:
             )
         ''')
 
+        # 旧版本由爬虫创建的表没有topic列
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(sent_papers)')}
+        if 'topic' not in columns:
+            cursor.execute('ALTER TABLE sent_papers ADD COLUMN topic TEXT')
+
+        # 创建论文存档表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                authors TEXT NOT NULL,
+                abstract TEXT,
+                published TIMESTAMP,
+                url TEXT,
+                categories TEXT NOT NULL,
+                topic TEXT,
+                fetched_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_papers_published ON papers (published)')
+
+        # 创建分类与作者倒排索引
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS paper_categories (
+                category TEXT NOT NULL,
+                arxiv_id TEXT NOT NULL,
+                PRIMARY KEY (category, arxiv_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_paper_categories_id ON paper_categories (arxiv_id)')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS paper_authors (
+                author_key TEXT NOT NULL,
+                arxiv_id TEXT NOT NULL,
+                author TEXT NOT NULL,
+                PRIMARY KEY (author_key, arxiv_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_paper_authors_id ON paper_authors (arxiv_id)')
+
+        # 创建历史回填断点表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                topic TEXT NOT NULL,
+                window_start TEXT NOT NULL,
+                window_end TEXT NOT NULL,
+                next_start INTEGER NOT NULL DEFAULT 0,
+                total INTEGER,
+                completed INTEGER NOT NULL DEFAULT 0,
+                updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (topic, window_start, window_end)
+            )
+        ''')
+
         conn.commit()
+
+        # 已有存档但索引为空时（从旧版本升级），重建索引
+        cursor.execute('''
+            SELECT EXISTS (SELECT 1 FROM papers) AND NOT EXISTS (SELECT 1 FROM paper_categories)
+        ''')
+        needs_rebuild = cursor.fetchone()[0]
+        conn.close()
+        if needs_rebuild:
+            self.rebuild_index()
+
+    @staticmethod
+    def _insert_papers(cursor: sqlite3.Cursor, papers: List[Paper], topic: Optional[str]):
+        """批量写入论文存档，并同步更新分类与作者倒排索引"""
+        cursor.executemany('''
+            INSERT INTO papers (arxiv_id, title, authors, abstract, published, url, categories, topic)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (arxiv_id) DO UPDATE SET
+                title = excluded.title,
+                authors = excluded.authors,
+                abstract = excluded.abstract,
+                published = excluded.published,
+                url = excluded.url,
+                categories = excluded.categories,
+                topic = COALESCE(papers.topic, excluded.topic)
+        ''', [
+            (paper.arxiv_id, paper.title, json.dumps(paper.authors, ensure_ascii=False), paper.abstract,
+             paper.published.strftime('%Y-%m-%d %H:%M:%S'), paper.url,
+             json.dumps(paper.categories, ensure_ascii=False), topic)
+            for paper in papers
+        ])
+
+        ids = [(paper.arxiv_id,) for paper in papers]
+        cursor.executemany('DELETE FROM paper_categories WHERE arxiv_id = ?', ids)
+        cursor.executemany('DELETE FROM paper_authors WHERE arxiv_id = ?', ids)
+        cursor.executemany('''
+            INSERT OR IGNORE INTO paper_categories (category, arxiv_id) VALUES (?, ?)
+        ''', [(category, paper.arxiv_id) for paper in papers for category in paper.categories])
+        cursor.executemany('''
+            INSERT OR IGNORE INTO paper_authors (author_key, arxiv_id, author) VALUES (?, ?, ?)
+        ''', [(normalize_author(author), paper.arxiv_id, author)
+              for paper in papers for author in paper.authors])
+
+    @staticmethod
+    def _row_to_paper(row: tuple) -> Paper:
+        """将papers表的行转换为论文对象"""
+        arxiv_id, title, authors, abstract, published, url, categories = row[:7]
+        return Paper(
+            title=title,
+            authors=json.loads(authors),
+            abstract=abstract or '',
+            published=datetime.strptime(published, '%Y-%m-%d %H:%M:%S'),
+            url=url or '',
+            arxiv_id=arxiv_id,
+            categories=json.loads(categories)
+        )
+
+    def save_papers(self, papers: List[Paper], topic: Optional[str] = None) -> int:
+        """
+        批量保存论文到存档（单个事务）
+
+        Args:
+            papers: 论文列表
+            topic: 主题
+
+        Returns:
+            写入的论文数
+        """
+        conn = sqlite3.connect(self.db_file)
+        try:
+            with conn:
+                self._insert_papers(conn.cursor(), papers, topic)
+        finally:
+            conn.close()
+        return len(papers)
+
+    def mark_papers_sent(self, papers: List[Paper], topic: Optional[str] = None):
+        """
+        记录已发送的论文，并将完整信息写入存档（单个事务）
+
+        Args:
+            papers: 论文列表
+            topic: 主题
+        """
+        self.mark_papers_sent_batch([(papers, topic)])
+
+    def mark_papers_sent_batch(self, batches: Iterable[Tuple[List[Paper], Optional[str]]]):
+        """
+        在单个事务中记录多批已发送的论文（可来自不同主题）
+
+        Args:
+            batches: (论文列表, 主题)列表
+        """
+        conn = sqlite3.connect(self.db_file)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                for papers, topic in batches:
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO sent_papers (arxiv_id, title, topic)
+                        VALUES (?, ?, ?)
+                    ''', [(paper.arxiv_id, paper.title, topic) for paper in papers])
+                    self._insert_papers(cursor, papers, topic)
+        finally:
+            conn.close()
+
+    def get_sent_ids(self) -> Set[str]:
+        """获取所有已发送论文的ID"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('SELECT arxiv_id FROM sent_papers')
+        ids = {row[0] for row in cursor}
         conn.close()
+        return ids
+
+    def get_backfill_checkpoint(self, topic: str, window_start: str,
+                                window_end: str) -> Optional[Tuple[int, Optional[int], bool]]:
+        """
+        获取历史回填断点
+
+        Args:
+            topic: 主题
+            window_start: 时间窗口起点
+            window_end: 时间窗口终点
+
+        Returns:
+            (下一页起始位置, 结果总数, 是否已完成)，没有断点时返回None
+        """
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT next_start, total, completed
+            FROM backfill_checkpoints
+            WHERE topic = ? AND window_start = ? AND window_end = ?
+        ''', (topic, window_start, window_end))
+        row = cursor.fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return row[0], row[1], bool(row[2])
+
+    def save_backfill_page(self, topic: str, window_start: str, window_end: str, papers: List[Paper],
+                           next_start: int, total: Optional[int], completed: bool):
+        """
+        保存一页回填结果并更新断点（同一事务，保证中断后可准确续传）
+
+        Args:
+            topic: 主题
+            window_start: 时间窗口起点
+            window_end: 时间窗口终点
+            papers: 本页论文
+            next_start: 下一页起始位置
+            total: 结果总数
+            completed: 该窗口是否已完成
+        """
+        conn = sqlite3.connect(self.db_file)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                self._insert_papers(cursor, papers, topic)
+                cursor.execute('''
+                    INSERT OR REPLACE INTO backfill_checkpoints
+                        (topic, window_start, window_end, next_start, total, completed, updated_time)
+                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (topic, window_start, window_end, next_start, total, int(completed)))
+        finally:
+            conn.close()
+
+    def rebuild_index(self):
+        """根据论文存档重建分类与作者倒排索引"""
+        conn = sqlite3.connect(self.db_file)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM paper_categories')
+                cursor.execute('DELETE FROM paper_authors')
+                for arxiv_id, authors, categories in conn.execute(
+                        'SELECT arxiv_id, authors, categories FROM papers'):
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO paper_categories (category, arxiv_id) VALUES (?, ?)
+                    ''', [(category, arxiv_id) for category in json.loads(categories)])
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO paper_authors (author_key, arxiv_id, author) VALUES (?, ?, ?)
+                    ''', [(normalize_author(author), arxiv_id, author) for author in json.loads(authors)])
+        finally:
+            conn.close()
+        logger.info("已重建分类与作者索引")
+
+    def find_papers(self, categories: Optional[Iterable[str]] = None, authors: Optional[Iterable[str]] = None,
+                    since: Optional[datetime] = None, unsent_only: bool = False,
+                    limit: Optional[int] = None) -> List[Paper]:
+        """
+        从本地存档查询论文（使用分类与作者索引）
+
+        Args:
+            categories: 分类列表，匹配任一分类
+            authors: 作者列表，匹配任一作者（忽略大小写、重音符号和标点）
+            since: 只返回该时间之后发布的论文
+            unsent_only: 只返回未发送过的论文
+            limit: 最多返回数量
+
+        Returns:
+            按发布时间倒序排列的论文列表
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if categories:
+            categories = list(categories)
+            conditions.append(f'''arxiv_id IN (
+                SELECT arxiv_id FROM paper_categories WHERE category IN ({','.join('?' * len(categories))}))''')
+            params.extend(categories)
+        if authors:
+            keys = [normalize_author(author) for author in authors]
+            conditions.append(f'''arxiv_id IN (
+                SELECT arxiv_id FROM paper_authors WHERE author_key IN ({','.join('?' * len(keys))}))''')
+            params.extend(keys)
+        if since is not None:
+            conditions.append('published >= ?')
+            params.append(since.strftime('%Y-%m-%d %H:%M:%S'))
+        if unsent_only:
+            conditions.append('arxiv_id NOT IN (SELECT arxiv_id FROM sent_papers)')
+
+        sql = 'SELECT arxiv_id, title, authors, abstract, published, url, categories FROM papers'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY published DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        papers = [self._row_to_paper(row) for row in cursor]
+        conn.close()
+        return papers
+
+    def iter_papers(self, since: datetime, until: Optional[datetime] = None, topic: Optional[str] = None,
+                    batch_size: int = 1000) -> Iterator[Tuple[Optional[str], Paper]]:
+        """
+        按发布时间范围流式读取本地存档，内存占用只与批大小有关
+
+        Args:
+            since: 起始发布时间（含）
+            until: 结束发布时间（不含，默认不限）
+            topic: 只返回该主题的论文（默认不限）
+            batch_size: 每批读取的行数
+
+        Returns:
+            (主题, 论文)迭代器
+        """
+        sql = ('SELECT arxiv_id, title, authors, abstract, published, url, categories, topic '
+               'FROM papers WHERE published >= ?')
+        params: List[Any] = [since.strftime('%Y-%m-%d %H:%M:%S')]
+        if until is not None:
+            sql += ' AND published < ?'
+            params.append(until.strftime('%Y-%m-%d %H:%M:%S'))
+        if topic:
+            sql += ' AND topic = ?'
+            params.append(topic)
+
+        conn = sqlite3.connect(self.db_file)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield row[7], self._row_to_paper(row)
+        finally:
+            conn.close()
+
+    def get_category_counts(self, since: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """
+        统计存档中各分类的论文数（使用分类索引）
+
+        Args:
+            since: 只统计该时间之后发布的论文
+
+        Returns:
+            按论文数倒序排列的(分类, 论文数)列表
+        """
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        if since is None:
+            cursor.execute('''
+                SELECT category, COUNT(*) FROM paper_categories
+                GROUP BY category ORDER BY COUNT(*) DESC, category
+            ''')
+        else:
+            cursor.execute('''
+                SELECT c.category, COUNT(*) FROM paper_categories c
+                JOIN papers p ON p.arxiv_id = c.arxiv_id
+                WHERE p.published >= ?
+                GROUP BY c.category ORDER BY COUNT(*) DESC, c.category
+            ''', (since.strftime('%Y-%m-%d %H:%M:%S'),))
+        counts = cursor.fetchall()
+        conn.close()
+        return counts
+
+    def get_author_counts(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """
+        统计存档中论文数最多的作者（使用作者索引）
+
+        Args:
+            limit: 返回数量
+
+        Returns:
+            按论文数倒序排列的(作者, 论文数)列表
+        """
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT MIN(author), COUNT(*) FROM paper_authors
+            GROUP BY author_key ORDER BY COUNT(*) DESC LIMIT ?
+        ''', (limit,))
+        counts = cursor.fetchall()
+        conn.close()
+        return counts
+
+    def get_paper_count(self) -> int:
+        """获取存档论文总数"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM papers')
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
 
     def get_all_sent_papers(self) -> List[tuple[Any, ...]]:
         """获取所有已发送的论文"""
@@ -66,24 +469,38 @@ class DatabaseManager:
         conn.commit()
         deleted = cursor.rowcount
         conn.close()
-        print(f"已清除 {deleted} 条旧记录")
+        logger.info("已清除 %d 条旧记录", deleted)
 
     def reset_database(self):
         """重置数据库（清空所有记录）"""
         conn = sqlite3.connect(self.db_file)
         cursor = conn.cursor()
         cursor.execute('DROP TABLE IF EXISTS sent_papers')
+        cursor.execute('DROP TABLE IF EXISTS papers')
+        cursor.execute('DROP TABLE IF EXISTS paper_categories')
+        cursor.execute('DROP TABLE IF EXISTS paper_authors')
+        cursor.execute('DROP TABLE IF EXISTS backfill_checkpoints')
         conn.commit()
         conn.close()
-        print("数据库已重置")
+        logger.info("数据库已重置")
         self._init_database()
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     db = DatabaseManager()
 
     print("=== 数据库统计 ===")
     print(f"已发送论文总数: {db.get_sent_count()}")
+    print(f"存档论文总数: {db.get_paper_count()}")
+
+    print("\n=== 分类统计 ===")
+    for category, count in db.get_category_counts()[:10]:
+        print(f"{category}: {count}")
+
+    print("\n=== 论文最多的作者 ===")
+    for author, count in db.get_author_counts(10):
+        print(f"{author}: {count}")
 
     print("\n=== 最近发送的论文 ===")
     papers = db.get_all_sent_papers()[:10]
@@ -0,0 +1,222 @@
+"""
+进程内共享的去重服务
+
+同一进程中的所有爬虫与调度器共享一份已发送记录：历史只加载一次，
+一个爬虫标记的论文其他爬虫立即可见。发送前先原子地认领论文，避免多个主题同时发送同一篇；
+已发送记录在内存中立即生效，并合并成批写回SQLite。
+"""
+import atexit
+import logging
+import signal
+import threading
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import metrics
+from config import Config
+from db_manager import DatabaseManager
+from models import Paper
+
+logger = logging.getLogger(__name__)
+
+
+class DedupService:
+    """已发送论文去重服务"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, flush_size: int = 0,
+                 flush_interval: Optional[float] = None):
+        """
+        初始化去重服务（历史记录在首次使用时才加载）
+
+        Args:
+            db: 数据库管理器（默认在首次使用时按当前配置创建）
+            flush_size: 待写回的论文数达到该值时立即写回（默认为DEDUP_FLUSH_SIZE）
+            flush_interval: 标记后最多等待多久写回（秒，默认为DEDUP_FLUSH_INTERVAL）
+        """
+        self.db = db
+        self.flush_size = flush_size or Config.DEDUP_FLUSH_SIZE
+        self.flush_interval = Config.DEDUP_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._sent: Set[str] = set()  # 已发送（含尚未写回）的论文ID
+        self._claims: Dict[str, Hashable] = {}  # 正在发送的论文ID -> 认领者
+        self._pending: List[Tuple[List[Paper], Optional[str]]] = []  # 待写回的(论文列表, 主题)
+        self._pending_count = 0
+        self._loaded = False
+        self._lock = threading.Lock()  # 保护认领、标记与历史加载
+        self._flush_lock = threading.Lock()  # 保证写回按顺序进行
+        self._timer: Optional[threading.Timer] = None
+
+    def _ensure_loaded(self):
+        """首次使用时加载历史记录"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with metrics.timed('db_load'):
+                    if self.db is None:
+                        self.db = DatabaseManager()
+                    self._sent = self.db.get_sent_ids()
+                logger.info("已加载 %d 条历史记录", len(self._sent))
+            except Exception as e:
+                logger.error("加载历史记录失败: %s", e)
+            self._loaded = True
+
+    def is_sent(self, arxiv_id: str, owner: Optional[Hashable] = None) -> bool:
+        """
+        检查论文是否已发送或正被其他爬虫发送
+
+        只读检查不加锁，多个爬虫可以同时查询。
+
+        Args:
+            arxiv_id: 论文ID
+            owner: 查询者，自己认领的论文不算重复
+
+        Returns:
+            是否应跳过该论文
+        """
+        self._ensure_loaded()
+        claimant = self._claims.get(arxiv_id)
+        sent = arxiv_id in self._sent or (claimant is not None and claimant != owner)
+        metrics.DEDUP_LOOKUPS.inc(result='hit' if sent else 'miss')
+        return sent
+
+    def claim(self, papers: List[Paper], owner: Hashable, limit: int = 0) -> List[Paper]:
+        """
+        原子地认领尚未发送、也未被其他爬虫认领的论文
+
+        Args:
+            papers: 候选论文（按优先级排列）
+            owner: 认领者
+            limit: 最多认领数量（0表示不限）
+
+        Returns:
+            认领成功的论文，保持原有顺序
+        """
+        self._ensure_loaded()
+        claimed = []
+        with self._lock:
+            for paper in papers:
+                if limit and len(claimed) >= limit:
+                    break
+                if paper.arxiv_id in self._sent or self._claims.get(paper.arxiv_id, owner) != owner:
+                    continue
+                self._claims[paper.arxiv_id] = owner
+                claimed.append(paper)
+        return claimed
+
+    def release(self, papers: List[Paper], owner: Hashable):
+        """
+        释放认领（如邮件发送失败），论文可被再次认领
+
+        Args:
+            papers: 论文列表
+            owner: 认领者
+        """
+        with self._lock:
+            for paper in papers:
+                if self._claims.get(paper.arxiv_id) == owner:
+                    del self._claims[paper.arxiv_id]
+
+    def mark_sent(self, papers: List[Paper], topic: Optional[str] = None):
+        """
+        标记论文为已发送：内存中立即生效，数据库合并成批写回
+
+        Args:
+            papers: 论文列表
+            topic: 主题
+        """
+        if not papers:
+            return
+        self._ensure_loaded()
+        with self._lock:
+            for paper in papers:
+                self._sent.add(paper.arxiv_id)
+                self._claims.pop(paper.arxiv_id, None)
+            self._pending.append((list(papers), topic))
+            self._pending_count += len(papers)
+            flush_now = self._pending_count >= self.flush_size or self.flush_interval <= 0
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        将待写回的已发送记录在单个事务中写入数据库
+
+        Returns:
+            写入的论文数
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batches, self._pending = self._pending, []
+                count, self._pending_count = self._pending_count, 0
+            if not batches:
+                return 0
+            try:
+                with metrics.timed('db_write'):
+                    self.db.mark_papers_sent_batch(batches)
+                logger.info("已将 %d 篇论文的发送记录写入数据库", count)
+                return count
+            except Exception as e:
+                # 放回队列，下次写回时重试；内存中的记录不受影响
+                logger.error("写入发送记录失败: %s", e)
+                with self._lock:
+                    self._pending[:0] = batches
+                    self._pending_count += count
+                return 0
+
+    @property
+    def sent_count(self) -> int:
+        """已发送论文数（含尚未写回的记录）"""
+        self._ensure_loaded()
+        return len(self._sent)
+
+
+_services: Dict[str, DedupService] = {}
+_services_lock = threading.Lock()
+
+
+def get_dedup_service() -> DedupService:
+    """
+    获取当前数据库文件对应的进程内共享去重服务
+
+    同一进程中的所有爬虫与调度器共享同一份已发送记录，历史记录只加载一次。
+    """
+    with _services_lock:
+        service = _services.get(Config.DB_FILE)
+        if service is None:
+            service = _services[Config.DB_FILE] = DedupService()
+        return service
+
+
+@atexit.register
+def _flush_all():
+    """进程退出前写回所有未保存的发送记录"""
+    for service in list(_services.values()):
+        service.flush()
+
+
+def _exit_on_sigterm(signum, frame):
+    """收到终止信号时按正常流程退出"""
+    logger.info("收到终止信号，写回发送记录后退出")
+    raise SystemExit(128 + signum)
+
+
+def install_sigterm_handler():
+    """
+    收到SIGTERM（如systemd、docker stop）时正常退出，使未写回的发送记录得以保存
+
+    进程被信号直接终止时不会执行atexit，已发送但尚未写回的记录会丢失，下次运行时重复发送。
+    处理函数只抛出SystemExit，由任务的finally和atexit在释放锁之后写回，避免在持锁时重入写回。
+    只能在主线程中调用；已设置其他处理函数时不做修改。
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
@@ -1,13 +1,14 @@
 """
 邮件通知模块
 """
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List
+import logging
+from typing import Callable, List
 from datetime import datetime
+import metrics
 from config import Config
-from models import Paper
+from models import Digest, Paper
+
+logger = logging.getLogger(__name__)
 
 
 class EmailNotifier:
@@ -17,23 +18,21 @@ class EmailNotifier:
         """初始化邮件通知器"""
         self.smtp_server = Config.SMTP_SERVER
         self.smtp_port = Config.SMTP_PORT
+        self.use_tls = Config.SMTP_USE_TLS
         self.sender_email = Config.SENDER_EMAIL
         self.sender_password = Config.SENDER_PASSWORD
         self.receiver_email = Config.RECEIVER_EMAIL
 
-    def _create_email_content(self, papers: List[Paper], topic: str) -> str:
+    def _render_page(self, body: str) -> str:
         """
-        创建邮件内容
+        将正文包装为完整的HTML邮件页面
 
         Args:
-            papers: 论文列表
-            topic: 主题
+            body: 页面正文
 
         Returns:
             HTML格式的邮件内容
         """
-        today = datetime.now().strftime('%Y年%m月%d日')
-
         html_content = f"""
         <!DOCTYPE html>
         <html>
@@ -113,6 +112,52 @@ class EmailNotifier:
             </style>
         </head>
         <body>
+        """
+        html_content += body
+        html_content += """
+            <div class="footer">
+                <p>本邮件由 arXiv论文爬虫自动发送</p>
+                <p>如需取消订阅，请联系发送者</p>
+            </div>
+        </body>
+        </html>
+        """
+        return html_content
+
+    @staticmethod
+    def _render_paper(index: int, paper: Paper) -> str:
+        """渲染单篇论文"""
+        authors_str = ', '.join(paper.authors[:3])
+        if len(paper.authors) > 3:
+            authors_str += f' 等 {len(paper.authors)} 位作者'
+
+        return f"""
+                <div class="paper-item">
+                    <h3 class="paper-title">{index}. {paper.title}</h3>
+                    <div class="paper-meta">
+                        <p><strong>👤 作者:</strong> {authors_str}</p>
+                        <p><strong>📅 发布时间:</strong> {paper.published.strftime('%Y-%m-%d')}</p>
+                        <p><strong>🏷️ 分类:</strong> {', '.join(paper.categories)}</p>
+                    </div>
+                    <a href="{paper.url}" class="paper-link">📄 查看论文</a>
+                    <p class="paper-abstract">{paper.abstract}</p>
+                </div>
+            """
+
+    def _create_email_content(self, papers: List[Paper], topic: str) -> str:
+        """
+        创建邮件内容
+
+        Args:
+            papers: 论文列表
+            topic: 主题
+
+        Returns:
+            HTML格式的邮件内容
+        """
+        today = datetime.now().strftime('%Y年%m月%d日')
+
+        body = f"""
             <div class="header">
                 <h1>📚 arXiv论文日报</h1>
                 <p>主题: {topic}</p>
@@ -128,35 +173,59 @@ class EmailNotifier:
         """
 
         for i, paper in enumerate(papers, 1):
-            authors_str = ', '.join(paper.authors[:3])
-            if len(paper.authors) > 3:
-                authors_str += f' 等 {len(paper.authors)} 位作者'
+            body += self._render_paper(i, paper)
 
-            html_content += f"""
-                <div class="paper-item">
-                    <h3 class="paper-title">{i}. {paper.title}</h3>
-                    <div class="paper-meta">
-                        <p><strong>👤 作者:</strong> {authors_str}</p>
-                        <p><strong>📅 发布时间:</strong> {paper.published.strftime('%Y-%m-%d')}</p>
-                        <p><strong>🏷️ 分类:</strong> {', '.join(paper.categories)}</p>
-                    </div>
-                    <a href="{paper.url}" class="paper-link">📄 查看论文</a>
-                    <p class="paper-abstract">{paper.abstract}</p>
-                </div>
-            """
+        body += """
+            </div>
+        """
+        return self._render_page(body)
+
+    def _create_digest_content(self, digest: Digest) -> str:
+        """
+        创建汇总邮件内容
+
+        Args:
+            digest: 周报/月报汇总
+
+        Returns:
+            HTML格式的邮件内容
+        """
+        period = f"{digest.start.strftime('%Y年%m月%d日')} ~ {digest.end.strftime('%Y年%m月%d日')}"
+        shown_groups = f'（展示前 {len(digest.groups)} 组）' if len(digest.groups) < digest.group_count else ''
 
-        html_content += f"""
+        body = f"""
+            <div class="header">
+                <h1>📚 arXiv论文{digest.title}</h1>
+                <p>主题: {digest.topic or '全部主题'}</p>
+                <p>时间范围: {period}</p>
             </div>
 
-            <div class="footer">
-                <p>本邮件由 arXiv论文爬虫自动发送</p>
-                <p>如需取消订阅，请联系发送者</p>
+            <div class="stats">
+                <h3>📊 本期统计</h3>
+                <p>本地存档中共有 <strong>{digest.total}</strong> 篇论文，共 <strong>{digest.group_count}</strong> 组{shown_groups}</p>
+                <ul>
+        """
+        for group in digest.groups:
+            body += f"""
+                    <li>{group.name}: {group.count} 篇</li>
+            """
+        body += """
+                </ul>
             </div>
-        </body>
-        </html>
         """
 
-        return html_content
+        for group in digest.groups:
+            shown = f'（展示前 {len(group.papers)} 篇）' if len(group.papers) < group.count else ''
+            body += f"""
+            <div class="papers">
+                <h2>🏷️ {group.name} · {group.count} 篇{shown}</h2>
+            """
+            for i, paper in enumerate(group.papers, 1):
+                body += self._render_paper(i, paper)
+            body += """
+            </div>
+            """
+        return self._render_page(body)
 
     def send_email(self, papers: List[Paper], topic: str) -> bool:
         """
@@ -170,35 +239,74 @@ class EmailNotifier:
             是否发送成功
         """
         if not papers:
-            print("没有论文需要发送")
+            logger.info("没有论文需要发送")
             return False
 
+        subject = f'📚 arXiv论文日报 - {topic} - {datetime.now().strftime("%Y-%m-%d")}'
+        return self._send(subject, lambda: self._create_email_content(papers, topic))
+
+    def send_digest(self, digest: Digest) -> bool:
+        """
+        发送周报/月报汇总邮件
+
+        Args:
+            digest: 周报/月报汇总
+
+        Returns:
+            是否发送成功
+        """
+        if not digest.groups:
+            logger.info("汇总中没有论文，不发送邮件")
+            return False
+
+        subject = (f'📚 arXiv论文{digest.title} - {digest.topic or "全部主题"} - '
+                   f'{digest.start.strftime("%Y-%m-%d")} ~ {digest.end.strftime("%Y-%m-%d")}')
+        return self._send(subject, lambda: self._create_digest_content(digest))
+
+    def _send(self, subject: str, render: Callable[[], str]) -> bool:
+        """
+        渲染并发送HTML邮件
+
+        Args:
+            subject: 邮件主题
+            render: 生成HTML内容的函数
+
+        Returns:
+            是否发送成功
+        """
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
         try:
-            # 创建邮件
-            message = MIMEMultipart('alternative')
-            message['From'] = self.sender_email
-            message['To'] = self.receiver_email
-            message['Subject'] = f'📚 arXiv论文日报 - {topic} - {datetime.now().strftime("%Y-%m-%d")}'
+            with metrics.timed('render'):
+                # 创建邮件
+                message = MIMEMultipart('alternative')
+                message['From'] = self.sender_email
+                message['To'] = self.receiver_email
+                message['Subject'] = subject
 
-            # 创建HTML内容
-            html_content = self._create_email_content(papers, topic)
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            message.attach(html_part)
+                # 创建HTML内容
+                html_content = render()
+                html_part = MIMEText(html_content, 'html', 'utf-8')
+                message.attach(html_part)
 
             # 连接SMTP服务器并发送
-            print(f"正在连接SMTP服务器: {self.smtp_server}:{self.smtp_port}")
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # 启用TLS加密
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(message)
+            logger.info("正在连接SMTP服务器: %s:%d", self.smtp_server, self.smtp_port)
+            with metrics.timed('smtp'):
+                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                    if self.use_tls:
+                        server.starttls()  # 启用TLS加密
+                    server.login(self.sender_email, self.sender_password)
+                    server.send_message(message)
 
-            print(f"邮件已成功发送至: {self.receiver_email}")
+            logger.info("邮件已成功发送至: %s", self.receiver_email)
             return True
 
         except smtplib.SMTPAuthenticationError:
-            print("错误: SMTP认证失败，请检查邮箱和密码")
-            print("注意: 如果使用Gmail，需要使用应用专用密码而非普通密码")
+            logger.error("SMTP认证失败，请检查邮箱和密码"
+                         "（如果使用Gmail，需要使用应用专用密码而非普通密码）")
             return False
         except Exception as e:
-            print(f"发送邮件失败: {str(e)}")
+            logger.error("发送邮件失败: %s", e)
             return False
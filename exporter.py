@@ -0,0 +1,274 @@
+"""
+论文存档导出模块
+
+将已发送论文（或全部存档）分块流式导出为列式文件，内存占用与历史规模无关：
+
+- Parquet / Arrow IPC（需要pyarrow）：分类与作者为字符串列表列，Arrow IPC文件可零拷贝内存映射
+- NumPy .npy（需要numpy）：标量列为结构化数组，分类与作者为展平数组加偏移量数组，
+  均可通过 np.load(path, mmap_mode='r') 零拷贝读取
+"""
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('auto', 'parquet', 'arrow', 'npy')
+EXPORT_SOURCES = ('sent', 'archive')
+
+# 扩展名 -> 导出格式
+_EXTENSIONS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.npy': 'npy'}
+
+# 导出列：(列名, 查询表达式)
+_COLUMNS = (
+    ('arxiv_id', 'arxiv_id'),
+    ('title', 'COALESCE(p.title, s.title)'),
+    ('topic', 'COALESCE(s.topic, p.topic)'),
+    ('sent_time', 's.sent_time'),
+    ('published', 'p.published'),
+    ('categories', 'p.categories'),
+    ('authors', 'p.authors'),
+)
+
+# .npy导出中分类与作者的展平存储：列名 -> 查询表达式
+_LIST_COLUMNS = {'categories': 'p.categories', 'authors': 'p.authors'}
+
+# .npy导出中标题的最大宽度，更长的标题会被截断（定长字段按最长值分配，个别异常值会放大整列）
+_NPY_TITLE_WIDTH = 512
+
+_FROM = {
+    # 已发送的论文（存档中缺失的字段为空）
+    'sent': 'sent_papers s LEFT JOIN papers p USING (arxiv_id)',
+    # 全部存档论文（未发送的sent_time为空）
+    'archive': 'papers p LEFT JOIN sent_papers s USING (arxiv_id)',
+}
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """解析SQLite中的时间字符串"""
+    if not value:
+        return None
+    return datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S')
+
+
+def _parse_list(value: Optional[str]) -> List[str]:
+    """解析JSON数组字段"""
+    return json.loads(value) if value else []
+
+
+class ArchiveExporter:
+    """论文存档导出器"""
+
+    def __init__(self, source: str = 'sent', chunk_size: int = 0):
+        """
+        初始化导出器
+
+        Args:
+            source: 导出范围，sent（已发送论文）或archive（全部存档）
+            chunk_size: 每块行数（默认为EXPORT_CHUNK_SIZE）
+        """
+        if source not in EXPORT_SOURCES:
+            raise ValueError(f"不支持的导出范围: {source}")
+        self.source = source
+        self.chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+        self.db_file = DatabaseManager().db_file
+
+    def _select(self, columns: str) -> str:
+        return f'SELECT {columns} FROM {_FROM[self.source]}'
+
+    def _iter_chunks(self, conn: sqlite3.Connection) -> Iterator[List[tuple]]:
+        """分块读取导出行"""
+        cursor = conn.execute(self._select(', '.join(expr for _, expr in _COLUMNS)) + ' ORDER BY arxiv_id')
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    def export(self, path: str, fmt: str = 'auto') -> int:
+        """
+        导出到文件
+
+        Args:
+            path: 输出文件路径
+            fmt: 文件格式（auto根据扩展名选择；没有扩展名时根据已安装的库选择并补上扩展名）
+
+        Returns:
+            导出的行数
+        """
+        path, fmt = self._resolve_format(path, fmt)
+        logger.info("正在导出%s到 %s（格式: %s，每块 %d 行）",
+                    '已发送论文' if self.source == 'sent' else '全部存档', path, fmt, self.chunk_size)
+
+        conn = sqlite3.connect(self.db_file)
+        try:
+            # 在同一个读事务中统计与读取，保证数据一致
+            conn.execute('BEGIN')
+            if fmt == 'npy':
+                count = self._export_npy(conn, path)
+            else:
+                count = self._export_arrow(conn, path, fmt)
+        finally:
+            conn.close()
+
+        logger.info("导出完成，共 %d 行", count)
+        return count
+
+    @staticmethod
+    def _resolve_format(path: str, fmt: str) -> Tuple[str, str]:
+        """
+        确定导出格式与输出路径
+
+        auto模式下按扩展名选择格式，无法识别的扩展名会报错；
+        没有扩展名时根据已安装的库选择格式，并补上对应的扩展名。
+
+        Returns:
+            (输出路径, 导出格式)
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {fmt}")
+        if fmt != 'auto':
+            return path, fmt
+        ext = os.path.splitext(path)[1].lower()
+        if ext:
+            if ext not in _EXTENSIONS:
+                raise ValueError(f"无法根据扩展名 {ext} 确定导出格式，"
+                                 f"请使用 {'/'.join(_EXTENSIONS)} 或通过 --export-format 指定格式")
+            return path, _EXTENSIONS[ext]
+        try:
+            import pyarrow  # noqa: F401
+            fmt = 'parquet'
+        except ImportError:
+            fmt = 'npy'
+        return f'{path}.{fmt}', fmt
+
+    def _export_arrow(self, conn: sqlite3.Connection, path: str, fmt: str) -> int:
+        """导出为Parquet或Arrow IPC文件"""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("导出Parquet/Arrow格式需要安装pyarrow（pip install pyarrow），"
+                               "或使用 --export-format npy")
+
+        schema = pa.schema([
+            ('arxiv_id', pa.string()),
+            ('title', pa.string()),
+            ('topic', pa.string()),
+            ('sent_time', pa.timestamp('s')),
+            ('published', pa.timestamp('s')),
+            ('categories', pa.list_(pa.string())),
+            ('authors', pa.list_(pa.string())),
+        ])
+
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(path, schema)
+        else:
+            writer = pa.ipc.new_file(path, schema)
+
+        count = 0
+        try:
+            for rows in self._iter_chunks(conn):
+                arxiv_ids, titles, topics, sent_times, published, categories, authors = zip(*rows)
+                batch = pa.RecordBatch.from_arrays([
+                    pa.array(arxiv_ids, pa.string()),
+                    pa.array(titles, pa.string()),
+                    pa.array(topics, pa.string()),
+                    pa.array([_parse_time(v) for v in sent_times], pa.timestamp('s')),
+                    pa.array([_parse_time(v) for v in published], pa.timestamp('s')),
+                    pa.array([_parse_list(v) for v in categories], pa.list_(pa.string())),
+                    pa.array([_parse_list(v) for v in authors], pa.list_(pa.string())),
+                ], schema=schema)
+                writer.write_batch(batch)
+                count += len(rows)
+        finally:
+            writer.close()
+        return count
+
+    def _field_widths(self, conn: sqlite3.Connection) -> Tuple[int, Dict[str, int]]:
+        """统计行数与结构化数组中各字符串列的宽度"""
+        exprs = dict(_COLUMNS)
+        names = ('arxiv_id', 'topic', 'title')
+        select = ', '.join(['COUNT(*)'] + [f'MAX(LENGTH({exprs[name]}))' for name in names])
+        row = conn.execute(self._select(select)).fetchone()
+        widths = {name: max(width or 0, 1) for name, width in zip(names, row[1:])}
+        if widths['title'] > _NPY_TITLE_WIDTH:
+            logger.warning("最长的标题有 %d 个字符，超过 %d 个字符的标题将被截断", widths['title'], _NPY_TITLE_WIDTH)
+            widths['title'] = _NPY_TITLE_WIDTH
+        return row[0], widths
+
+    def _list_sizes(self, conn: sqlite3.Connection, expr: str) -> Tuple[int, int]:
+        """统计列表列展平后的元素总数与单个元素的最大长度"""
+        row = conn.execute(self._select('COUNT(j.value), MAX(LENGTH(j.value))') + f', json_each({expr}) j').fetchone()
+        return row[0], max(row[1] or 0, 1)
+
+    @staticmethod
+    def _list_paths(path: str, name: str) -> Tuple[str, str]:
+        """列表列的展平数组与偏移量数组路径"""
+        stem = os.path.splitext(path)[0]
+        return f'{stem}.{name}.npy', f'{stem}.{name}_offsets.npy'
+
+    def _export_npy(self, conn: sqlite3.Connection, path: str) -> int:
+        """
+        导出为NumPy数组
+
+        标量列写入path中的结构化数组；分类与作者各写入一个展平的字符串数组，
+        以及一个长度为行数+1的int64偏移量数组，第i行的作者为 authors[offsets[i]:offsets[i + 1]]。
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise RuntimeError("导出.npy格式需要安装numpy（pip install numpy）")
+
+        count, widths = self._field_widths(conn)
+        dtype = np.dtype([
+            ('arxiv_id', f'U{widths["arxiv_id"]}'),
+            ('title', f'U{widths["title"]}'),
+            ('topic', f'U{widths["topic"]}'),
+            ('sent_time', 'datetime64[s]'),
+            ('published', 'datetime64[s]'),
+        ])
+
+        # 预先分配内存映射文件，逐块写入，内存占用只与块大小有关
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(count,))
+        lists = {}
+        for name, expr in _LIST_COLUMNS.items():
+            size, width = self._list_sizes(conn, expr)
+            values_path, offsets_path = self._list_paths(path, name)
+            values = np.lib.format.open_memmap(values_path, mode='w+', dtype=f'U{width}', shape=(size,))
+            offsets = np.lib.format.open_memmap(offsets_path, mode='w+', dtype=np.int64, shape=(count + 1,))
+            offsets[0] = 0
+            lists[name] = [values, offsets, 0]
+
+        offset = 0
+        for rows in self._iter_chunks(conn):
+            rows = rows[:count - offset]
+            if not rows:
+                break
+            chunk = np.empty(len(rows), dtype=dtype)
+            arxiv_ids, titles, topics, sent_times, published, categories, authors = zip(*rows)
+            chunk['arxiv_id'] = arxiv_ids
+            chunk['title'] = [(v or '')[:widths['title']] for v in titles]
+            chunk['topic'] = [v or '' for v in topics]
+            chunk['sent_time'] = [_parse_time(v) for v in sent_times]
+            chunk['published'] = [_parse_time(v) for v in published]
+            array[offset:offset + len(rows)] = chunk
+            for name, column in (('categories', categories), ('authors', authors)):
+                values, offsets, position = lists[name]
+                items = [_parse_list(v) for v in column]
+                flat = [item for row_items in items for item in row_items]
+                values[position:position + len(flat)] = flat
+                offsets[offset + 1:offset + len(rows) + 1] = position + np.cumsum([len(v) for v in items])
+                lists[name][2] = position + len(flat)
+            offset += len(rows)
+
+        for mapped in [array] + [m for values, offsets, _ in lists.values() for m in (values, offsets)]:
+            mapped.flush()
+        del array, lists
+        return offset
@@ -0,0 +1,89 @@
+"""
+arXiv Atom feed解析模块
+
+不依赖爬虫与请求模块，可在进程池中并行执行，供请求、爬虫与回填模块共同使用。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from models import Paper
+
+
+@dataclass
+class FeedPage:
+    """一页feed的解析结果"""
+    papers: List[Paper]
+    total: int  # 查询结果总数
+    warning: Optional[str] = None  # 解析警告信息
+    syntax_error: bool = False  # XML语法错误（如响应被截断），此类页面不可信
+
+
+def parse_entry(entry) -> Paper:
+    """
+    将feed条目转换为论文对象
+
+    Args:
+        entry: feedparser解析出的条目
+
+    Returns:
+        论文对象
+    """
+    # 提取作者（确保都是字符串类型）
+    authors = []
+    if 'authors' in entry:
+        authors = [str(author.name) for author in entry.authors]
+    elif 'author' in entry:
+        authors = [str(entry.author)]
+
+    # 提取arXiv ID（确保id是字符串类型）
+    entry_id = str(entry.id)
+    arxiv_id = entry_id.split('/')[-1]
+
+    # 提取分类（确保都是字符串类型）
+    tags = []
+    if 'tags' in entry:
+        tags = [str(tag.term) for tag in entry.tags]
+
+    # 解析发布时间（确保published是字符串类型）
+    published_str = str(entry.published)
+    published = datetime.strptime(published_str, '%Y-%m-%dT%H:%M:%SZ')
+
+    # 创建论文对象（确保所有字符串字段都是str类型）
+    paper = Paper(
+        title=str(entry.title),
+        authors=authors,
+        abstract=str(entry.summary),
+        published=published,
+        url=str(entry.link),
+        arxiv_id=arxiv_id,
+        categories=tags
+    )
+    return paper
+
+
+def parse_feed(content: bytes) -> FeedPage:
+    """
+    解析API返回的Atom feed
+
+    Args:
+        content: feed内容
+
+    Returns:
+        解析结果
+
+    Raises:
+        Exception: 条目字段缺失（如响应在条目中间被截断）
+    """
+    import feedparser
+    from xml.sax import SAXException
+
+    feed = feedparser.parse(content)
+    papers = [parse_entry(entry) for entry in feed.entries]
+    try:
+        total = int(feed.feed.get('opensearch_totalresults', len(papers)))
+    except (TypeError, ValueError):
+        total = len(papers)
+    if not feed.bozo:
+        return FeedPage(papers, total)
+    return FeedPage(papers, total, str(feed.bozo_exception), isinstance(feed.bozo_exception, SAXException))
@@ -0,0 +1,341 @@
+"""
+arXiv API请求模块
+
+对失败进行分类（超时、限流、服务端错误、XML损坏、异常空页），
+按带抖动的指数退避重试，遇到限流时自动放慢请求频率，并在API持续不可用时熔断。
+"""
+import logging
+import random
+import socket
+import threading
+import time
+from typing import Optional, Tuple
+
+import metrics
+from config import Config
+from feed_parser import FeedPage, parse_feed
+
+logger = logging.getLogger(__name__)
+
+# 可重试的失败类型
+RETRYABLE_KINDS = ('timeout', 'throttled', 'server_error', 'network', 'malformed', 'empty')
+
+
+class FetchError(Exception):
+    """请求失败"""
+
+    def __init__(self, kind: str, message: str, retry_after: Optional[float] = None):
+        """
+        Args:
+            kind: 失败类型（timeout/throttled/server_error/client_error/network/malformed/empty/circuit_open）
+            message: 错误信息
+            retry_after: 服务端要求的等待时间（秒）
+        """
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """是否值得重试"""
+        return self.kind in RETRYABLE_KINDS
+
+
+class CircuitOpenError(FetchError):
+    """熔断器打开，暂停请求"""
+
+    def __init__(self, remaining: float):
+        super().__init__('circuit_open', f"arXiv API暂不可用，熔断中（剩余 {remaining:.0f} 秒）")
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头（秒数或HTTP日期）"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_exception(error: BaseException) -> FetchError:
+    """
+    将下载异常归类
+
+    Args:
+        error: 原始异常
+
+    Returns:
+        分类后的请求失败
+    """
+    from urllib.error import HTTPError, URLError
+
+    if isinstance(error, HTTPError):
+        if error.code in (429, 503):
+            retry_after = _parse_retry_after(error.headers.get('Retry-After') if error.headers else None)
+            return FetchError('throttled', f"HTTP {error.code}", retry_after)
+        if error.code >= 500:
+            return FetchError('server_error', f"HTTP {error.code}")
+        return FetchError('client_error', f"HTTP {error.code}")
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return FetchError('timeout', "请求超时")
+    if isinstance(error, URLError):
+        if isinstance(error.reason, (socket.timeout, TimeoutError)):
+            return FetchError('timeout', "请求超时")
+        return FetchError('network', f"网络错误: {error.reason}")
+    if isinstance(error, (ConnectionError, OSError)):
+        return FetchError('network', f"网络错误: {error}")
+    return FetchError('network', f"{type(error).__name__}: {error}")
+
+
+def classify_page(page: FeedPage, start: int, page_size: int = 0) -> Optional[FetchError]:
+    """
+    检查解析结果是否可用
+
+    Args:
+        page: 解析结果
+        start: 本页起始位置
+        page_size: 请求的每页数量，指定时返回条目少于应有数量的页面视为被截断
+
+    Returns:
+        不可用时返回请求失败，否则返回None
+    """
+    if page.syntax_error:
+        # 响应被截断时，截断点之前的条目仍能解析出来，不能据此认为页面完整
+        return FetchError('malformed', f"XML损坏或不完整（已解析 {len(page.papers)} 条）: {page.warning}")
+    if not page.papers:
+        if page.warning:
+            return FetchError('malformed', f"XML损坏或不完整: {page.warning}")
+        if start < page.total:
+            # arXiv偶尔会对有结果的查询返回空页，重试通常可以恢复
+            return FetchError('empty', f"第 {start} 条起返回空页（共 {page.total} 条）")
+        return None
+    expected = min(page_size, page.total - start) if page_size else 0
+    if len(page.papers) < expected:
+        return FetchError('malformed', f"第 {start} 条起只返回 {len(page.papers)}/{expected} 条，响应可能被截断")
+    return None
+
+
+class RateLimiter:
+    """自适应请求频率限制：遇到限流时加倍间隔，请求成功后逐步恢复"""
+
+    def __init__(self, min_delay: float, max_delay: float):
+        """
+        Args:
+            min_delay: 最小请求间隔（秒）
+            max_delay: 最大请求间隔（秒）
+        """
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, min_delay)
+        self.delay = min_delay
+        self._last_request = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """等待到允许发出下一次请求"""
+        with self._lock:
+            metrics.rate_limit_sleep(self._last_request + self.delay - time.monotonic())
+            self._last_request = time.monotonic()
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """遇到限流，放慢请求频率"""
+        with self._lock:
+            self.delay = min(max(self.delay * 2, retry_after or 0.0, 1.0), self.max_delay)
+        logger.warning("请求被限流，请求间隔调整为 %.1f 秒", self.delay)
+
+    def on_success(self):
+        """请求成功，逐步恢复请求频率"""
+        with self._lock:
+            self.delay = max(self.delay * 0.8, self.min_delay)
+
+
+class CircuitBreaker:
+    """熔断器：连续失败达到阈值后暂停请求，冷却后放行一次试探请求"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        """
+        Args:
+            threshold: 触发熔断的连续失败次数
+            cooldown: 熔断持续时间（秒）
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于熔断状态（冷却期内）"""
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.cooldown
+
+    def before_request(self):
+        """请求前检查，熔断中时抛出CircuitOpenError"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.cooldown:
+                raise CircuitOpenError(self.cooldown - elapsed)
+            # 冷却结束，进入半开状态：放行本次请求，失败则立即重新熔断
+            self.failures = self.threshold - 1
+            self.opened_at = None
+
+    def record_success(self):
+        """记录成功"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """记录失败"""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                metrics.CIRCUIT_OPENED.inc()
+                logger.error("arXiv API连续失败 %d 次，暂停请求 %.0f 秒", self.failures, self.cooldown)
+
+
+class ArxivFetcher:
+    """带重试、限流与熔断的arXiv API客户端"""
+
+    def __init__(self, max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, rate_limiter: Optional[RateLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            max_retries: 最大重试次数（默认为FETCH_MAX_RETRIES）
+            backoff_base: 退避基数（秒，默认为FETCH_BACKOFF_BASE）
+            backoff_max: 最大退避时间（秒，默认为FETCH_BACKOFF_MAX）
+            rate_limiter: 请求频率限制
+            breaker: 熔断器
+        """
+        self.max_retries = Config.FETCH_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base if backoff_base is not None else Config.FETCH_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.FETCH_BACKOFF_MAX
+        self.rate_limiter = rate_limiter or RateLimiter(Config.REQUEST_DELAY, Config.REQUEST_DELAY_MAX)
+        self.breaker = breaker or CircuitBreaker(Config.BREAKER_THRESHOLD, Config.BREAKER_COOLDOWN)
+
+    @property
+    def circuit_open(self) -> bool:
+        """是否处于熔断状态"""
+        return self.breaker.is_open
+
+    def _backoff(self, attempt: int, error: FetchError):
+        """按带抖动的指数退避等待"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, min(error.retry_after, self.backoff_max))
+        logger.warning("请求失败（%s: %s），%.1f 秒后第 %d 次重试", error.kind, error, delay, attempt + 1)
+        metrics.FETCH_RETRIES.inc(kind=error.kind)
+        if delay > 0:
+            start = time.perf_counter()
+            time.sleep(delay)
+            metrics.RETRY_BACKOFF.observe(time.perf_counter() - start)
+
+    def _attempt(self, url: str) -> bytes:
+        """发出一次请求"""
+        from urllib.request import urlopen
+
+        self.breaker.before_request()
+        self.rate_limiter.wait()
+        try:
+            with metrics.timed('http_fetch'):
+                with urlopen(url, timeout=Config.REQUEST_TIMEOUT) as response:
+                    return response.read()
+        except Exception as e:
+            raise classify_exception(e) from e
+
+    def _record(self, error: Optional[FetchError]):
+        """记录一次请求结果"""
+        if error is None:
+            self.breaker.record_success()
+            self.rate_limiter.on_success()
+            return
+        metrics.FETCH_FAILURES.inc(kind=error.kind)
+        if error.kind == 'throttled':
+            self.rate_limiter.on_throttled(error.retry_after)
+        if error.kind != 'client_error':
+            self.breaker.record_failure()
+
+    def fetch(self, url: str) -> bytes:
+        """
+        下载原始响应，网络与HTTP层面的失败会自动重试
+
+        Args:
+            url: 请求URL
+
+        Returns:
+            响应内容
+
+        Raises:
+            FetchError: 重试耗尽或遇到不可重试的失败
+        """
+        return self._fetch(url, start=None, page_size=0)[0]
+
+    def fetch_feed(self, url: str, start: int = 0, page_size: int = 0) -> FeedPage:
+        """
+        下载并解析一页feed，XML损坏、响应被截断和异常空页同样会重试
+
+        Args:
+            url: 请求URL
+            start: 本页起始位置
+            page_size: 请求的每页数量，指定时条目不足的页面也会重试
+
+        Returns:
+            解析结果
+
+        Raises:
+            FetchError: 重试耗尽或遇到不可重试的失败
+        """
+        return self._fetch(url, start=start, page_size=page_size)[1]  # type: ignore[return-value]
+
+    def _fetch(self, url: str, start: Optional[int], page_size: int) -> Tuple[bytes, Optional[FeedPage]]:
+        attempt = 0
+        while True:
+            try:
+                content = self._attempt(url)
+                parsed = None
+                if start is not None:
+                    try:
+                        with metrics.timed('parse'):
+                            parsed = parse_feed(content)
+                    except Exception as e:
+                        # 条目在中间被截断时字段缺失，解析会直接抛出异常
+                        raise FetchError('malformed', f"无法解析feed: {type(e).__name__}: {e}") from e
+                    error = classify_page(parsed, start, page_size)
+                    if error is not None:
+                        raise error
+                self._record(None)
+                return content, parsed
+            except CircuitOpenError:
+                raise
+            except FetchError as e:
+                self._record(e)
+                if not e.retryable or attempt >= self.max_retries or self.breaker.is_open:
+                    raise
+                self._backoff(attempt, e)
+                attempt += 1
+
+
+_default_fetcher: Optional[ArxivFetcher] = None
+_default_lock = threading.Lock()
+
+
+def get_fetcher() -> ArxivFetcher:
+    """
+    获取进程内共享的请求客户端
+
+    arXiv的频率限制按来源计算，同一进程中的所有爬虫共享同一个频率限制与熔断状态。
+    """
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = ArxivFetcher()
+        return _default_fetcher
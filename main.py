@@ -2,9 +2,34 @@
 arXiv论文爬虫主程序
 """
 import argparse
+import logging
 import sys
+from datetime import date
+from typing import List, Optional
 from config import Config
-from scheduler import PaperScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(level: str):
+    """
+    配置日志输出
+
+    Args:
+        level: 日志级别名称
+    """
+    logging.basicConfig(
+        level=getattr(logging, level.upper(), logging.INFO),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def _split_list(value: Optional[str]) -> Optional[List[str]]:
+    """解析逗号分隔的命令行参数，未指定时返回None"""
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
 
 
 def main():
@@ -25,6 +50,18 @@ def main():
 
   # 每30分钟自动爬取
   python main.py -t "natural language processing" --interval 30
+
+  # 执行一次爬取并输出性能剖析结果
+  python main.py --once --profile
+
+  # 回填2023年以来的历史论文到本地存档（可中断后重新运行续传）
+  python main.py -t "machine learning" --backfill --from 2023-01-01
+
+  # 导出已发送论文为Parquet文件（未安装pyarrow时可导出为.npy）
+  python main.py --export sent_papers.parquet
+
+  # 根据本地存档发送按分类汇总的周报（不请求arXiv，不影响每日推送的去重）
+  python main.py --digest weekly --group-by category
         """
     )
 
@@ -35,6 +72,22 @@ def main():
         help='爬取主题（默认使用配置文件中的主题）'
     )
 
+    _ = parser.add_argument(
+        '--categories',
+        type=str,
+        default=None,
+        metavar='CATS',
+        help='只发送这些分类的论文，逗号分隔（如cs.LG,cs.AI）'
+    )
+
+    _ = parser.add_argument(
+        '--watch-authors',
+        type=str,
+        default=None,
+        metavar='AUTHORS',
+        help='关注的作者，逗号分隔，其论文总会被发送（包括本地存档中尚未发送的论文）'
+    )
+
     _ = parser.add_argument(
         '--once',
         action='store_true',
@@ -61,18 +114,183 @@ def main():
         help='每隔指定分钟数执行一次'
     )
 
+    _ = parser.add_argument(
+        '--backfill',
+        action='store_true',
+        help='按时间窗口回填历史论文到本地存档（不发送邮件，可断点续传）'
+    )
+
+    _ = parser.add_argument(
+        '--from',
+        dest='start_date',
+        type=date.fromisoformat,
+        metavar='YYYY-MM-DD',
+        help='回填起始日期（默认为一年前）'
+    )
+
+    _ = parser.add_argument(
+        '--to',
+        dest='end_date',
+        type=date.fromisoformat,
+        metavar='YYYY-MM-DD',
+        help='回填结束日期（默认为今天）'
+    )
+
+    _ = parser.add_argument(
+        '--window-days',
+        type=int,
+        default=0,
+        metavar='DAYS',
+        help='回填时每个时间窗口的天数（默认使用配置文件中的BACKFILL_WINDOW_DAYS）'
+    )
+
+    _ = parser.add_argument(
+        '--export',
+        type=str,
+        metavar='PATH',
+        help='将论文存档分块导出为列式文件（.parquet/.arrow/.npy）'
+    )
+
+    _ = parser.add_argument(
+        '--export-format',
+        type=str,
+        default='auto',
+        choices=['auto', 'parquet', 'arrow', 'npy'],
+        help='导出格式（auto根据扩展名和已安装的库自动选择）'
+    )
+
+    _ = parser.add_argument(
+        '--export-source',
+        type=str,
+        default='sent',
+        choices=['sent', 'archive'],
+        help='导出范围：sent为已发送论文，archive为全部存档论文'
+    )
+
+    _ = parser.add_argument(
+        '--digest',
+        type=str,
+        choices=['weekly', 'monthly'],
+        help='根据本地存档发送周报或月报汇总（不请求arXiv，不标记已发送）'
+    )
+
+    _ = parser.add_argument(
+        '--group-by',
+        type=str,
+        default='category',
+        choices=['category', 'topic'],
+        help='汇总的分组方式：category按主分类，topic按爬取主题'
+    )
+
+    _ = parser.add_argument(
+        '--log-level',
+        type=str,
+        default=Config.LOG_LEVEL,
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        help='日志级别（默认使用配置文件中的LOG_LEVEL）'
+    )
+
+    _ = parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=Config.METRICS_PORT,
+        metavar='PORT',
+        help='在本机指定端口提供Prometheus格式的指标（/metrics），0表示不启动'
+    )
+
+    _ = parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='剖析任务运行，输出剖析文件和各阶段耗时表'
+    )
+
+    _ = parser.add_argument(
+        '--profile-mode',
+        type=str,
+        default=Config.PROFILE_MODE,
+        choices=['sampling', 'cprofile'],
+        help='剖析方式：sampling输出折叠栈文件（开销低），cprofile输出pstats文件'
+    )
+
+    _ = parser.add_argument(
+        '--profile-sample-rate',
+        type=float,
+        default=None,
+        metavar='RATE',
+        help='被剖析的任务比例（0~1），指定--profile时默认为1'
+    )
+
+    _ = parser.add_argument(
+        '--profile-dir',
+        type=str,
+        default=Config.PROFILE_DIR,
+        metavar='DIR',
+        help='剖析结果输出目录'
+    )
+
     args = parser.parse_args()
+    setup_logging(args.log_level)
+
+    from dedup import install_sigterm_handler
+    install_sigterm_handler()
 
     try:
+        # 回填历史论文（不需要邮箱配置）
+        if args.backfill:
+            from backfill import Backfiller
+            Backfiller(args.topic, args.start_date, args.end_date, args.window_days).run()
+            return
+
+        # 导出论文存档（不需要邮箱配置）
+        if args.export:
+            from exporter import ArchiveExporter
+            try:
+                ArchiveExporter(args.export_source).export(args.export, args.export_format)
+            except ValueError as e:
+                parser.error(str(e))
+            return
+
         # 验证配置
         Config.validate()
 
-        # 创建调度器
-        scheduler = PaperScheduler(args.topic)
+        # 根据本地存档发送周报/月报汇总（未指定-t时汇总全部主题）
+        if args.digest:
+            from rollup import RollupDigest
+            RollupDigest(
+                args.digest,
+                args.group_by,
+                topic=args.topic,
+                categories=_split_list(args.categories),
+                watch_authors=_split_list(args.watch_authors)
+            ).send()
+            return
+
+        # 启动指标服务
+        if args.metrics_port:
+            import metrics
+            metrics.start_http_server(args.metrics_port)
+
+        # 创建剖析器
+        profiler = None
+        sample_rate = args.profile_sample_rate
+        if sample_rate is None:
+            sample_rate = 1.0 if args.profile else Config.PROFILE_SAMPLE_RATE
+        if args.profile or sample_rate > 0:
+            from profiler import RunProfiler
+            profiler = RunProfiler(args.profile_mode, args.profile_dir, sample_rate)
+
+        # 创建调度器（按需导入，避免仅解析参数时加载全部模块）
+        from scheduler import PaperScheduler
+        scheduler = PaperScheduler(
+            args.topic,
+            profiler=profiler,
+            categories=_split_list(args.categories),
+            watch_authors=_split_list(args.watch_authors)
+        )
 
         # 根据参数执行不同的调度模式
         if args.once:
-            print("执行一次性爬取任务...")
+            logger.info("执行一次性爬取任务...")
             scheduler.run_once()
         elif args.daily:
             scheduler.start_daily_schedule(args.daily)
@@ -82,23 +300,21 @@ def main():
             scheduler.start_interval_schedule(args.interval)
         else:
             # 默认：每天早上9点执行
-            print("未指定调度模式，使用默认配置：每天09:00执行")
+            logger.info("未指定调度模式，使用默认配置：每天09:00执行")
             parser.print_help()
-            print("\n启动默认调度...")
+            logger.info("启动默认调度...")
             scheduler.start_daily_schedule("09:00")
 
     except ValueError as e:
-        print(f"配置错误: {str(e)}")
-        print("\n请先配置.env文件：")
-        print("1. 复制.env.example为.env")
-        print("2. 填写邮箱相关信息")
-        print("3. 配置发送者邮箱和应用专用密码")
+        logger.error("配置错误: %s", e)
+        logger.error("请先配置.env文件：1. 复制.env.example为.env  "
+                     "2. 填写邮箱相关信息  3. 配置发送者邮箱和应用专用密码")
         sys.exit(1)
     except KeyboardInterrupt:
-        print("\n程序已退出")
+        logger.info("程序已退出")
         sys.exit(0)
     except Exception as e:
-        print(f"程序出错: {str(e)}")
+        logger.exception("程序出错: %s", e)
         sys.exit(1)
 
 
@@ -0,0 +1,311 @@
+"""
+运行指标模块
+
+提供计数器与延迟直方图，支持以Prometheus文本格式和JSON格式导出。
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认直方图桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = '') -> str:
+    """格式化Prometheus标签"""
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter:
+    """计数器"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        """增加计数"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """获取当前计数"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        """渲染为Prometheus文本行"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {value}')
+        return lines
+
+    def snapshot(self) -> Dict[str, float]:
+        """导出为字典"""
+        with self._lock:
+            return {','.join(key) or '_': value for key, value in sorted(self._values.items())}
+
+
+class Histogram:
+    """延迟直方图"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签对应: [各桶计数..., 总和, 总数]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """记录一次观测值"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        """渲染为Prometheus文本行"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = [(key, list(state)) for key, state in sorted(self._values.items())]
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            le = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{le} {state[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}')
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """导出为字典"""
+        with self._lock:
+            return {
+                ','.join(key) or '_': {'count': state[-1], 'sum': round(state[-2], 6)}
+                for key, state in sorted(self._values.items())
+            }
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册计数器"""
+        metric = Counter(name, documentation, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """注册直方图"""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def render_prometheus(self) -> str:
+        """以Prometheus文本格式导出全部指标"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())  # type: ignore[attr-defined]
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, object]:
+        """以字典形式导出全部指标"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}  # type: ignore[attr-defined]
+
+    def dump_json(self, path: str):
+        """
+        将全部指标写入JSON文件
+
+        Args:
+            path: 输出文件路径
+        """
+        data = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'metrics': self.snapshot(),
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            logger.debug("指标已写入: %s", path)
+        except OSError as e:
+            logger.warning("写入指标文件失败: %s", e)
+
+
+registry = MetricsRegistry()
+
+# 各阶段耗时: http_fetch / parse / dedup / db_load / db_write / render / smtp
+STAGE_SECONDS = registry.histogram(
+    'arxiv_stage_duration_seconds', '各阶段耗时（秒）', ['stage'])
+STAGE_CPU_SECONDS = registry.counter(
+    'arxiv_stage_cpu_seconds_total', '各阶段占用的CPU时间（秒）', ['stage'])
+STAGE_SELF_SECONDS = registry.counter(
+    'arxiv_stage_self_seconds_total', '各阶段自身耗时（秒，不含嵌套在其中的子阶段）', ['stage'])
+STAGE_SELF_CPU_SECONDS = registry.counter(
+    'arxiv_stage_self_cpu_seconds_total', '各阶段自身占用的CPU时间（秒，不含嵌套在其中的子阶段）', ['stage'])
+STAGE_ERRORS = registry.counter(
+    'arxiv_stage_errors_total', '各阶段失败次数', ['stage'])
+PAPERS_FETCHED = registry.counter(
+    'arxiv_papers_fetched_total', '从arXiv获取的论文数')
+PAPERS_SENT = registry.counter(
+    'arxiv_papers_sent_total', '已发送的论文数')
+PAPERS_PER_RUN = registry.histogram(
+    'arxiv_papers_per_run', '每次任务找到的新论文数',
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200))
+DEDUP_LOOKUPS = registry.counter(
+    'arxiv_dedup_lookups_total', '去重缓存查询次数（hit表示已发送过）', ['result'])
+RATE_LIMIT_WAIT = registry.histogram(
+    'arxiv_rate_limit_wait_seconds', '为遵守请求频率限制而等待的时间（秒）')
+RUNS = registry.counter(
+    'arxiv_runs_total', '任务执行次数', ['status'])
+FETCH_FAILURES = registry.counter(
+    'arxiv_fetch_failures_total', 'arXiv请求失败次数（按失败类型）', ['kind'])
+FETCH_RETRIES = registry.counter(
+    'arxiv_fetch_retries_total', 'arXiv请求重试次数（按失败类型）', ['kind'])
+RETRY_BACKOFF = registry.histogram(
+    'arxiv_retry_backoff_seconds', '重试前退避等待的时间（秒）')
+CIRCUIT_OPENED = registry.counter(
+    'arxiv_circuit_opened_total', '熔断器打开次数')
+
+
+# 每个线程当前嵌套的阶段，元素为该阶段内子阶段累计的[墙钟时间, CPU时间]
+_stage_stack = threading.local()
+
+
+def _current_stages() -> List[List[float]]:
+    stack = getattr(_stage_stack, 'stages', None)
+    if stack is None:
+        stack = _stage_stack.stages = []
+    return stack
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    记录代码块耗时
+
+    阶段可以嵌套（如dedup中首次加载历史记录的db_load），
+    STAGE_SECONDS记录包含子阶段的耗时，STAGE_SELF_SECONDS只记录阶段自身的耗时。
+
+    Args:
+        stage: 阶段名称
+    """
+    stack = _current_stages()
+    children = [0.0, 0.0]
+    stack.append(children)
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.thread_time() - cpu_start
+        stack.pop()
+        STAGE_SECONDS.observe(wall, stage=stage)
+        STAGE_CPU_SECONDS.inc(cpu, stage=stage)
+        STAGE_SELF_SECONDS.inc(max(wall - children[0], 0.0), stage=stage)
+        STAGE_SELF_CPU_SECONDS.inc(max(cpu - children[1], 0.0), stage=stage)
+        if stack:
+            stack[-1][0] += wall
+            stack[-1][1] += cpu
+
+
+def rate_limit_sleep(seconds: float):
+    """
+    为遵守请求频率限制而等待，并记录等待时间
+
+    Args:
+        seconds: 等待秒数
+    """
+    if seconds <= 0:
+        return
+    start = time.perf_counter()
+    time.sleep(seconds)
+    waited = time.perf_counter() - start
+    RATE_LIMIT_WAIT.observe(waited)
+    stack = _current_stages()
+    if stack:
+        # 等待单独列出，不计入外层阶段的自身耗时
+        stack[-1][0] += waited
+
+
+def start_http_server(port: int, host: str = '127.0.0.1') -> Optional[object]:
+    """
+    在后台线程中启动指标HTTP服务
+
+    /metrics 返回Prometheus文本格式，/metrics.json 返回JSON格式。
+
+    Args:
+        port: 监听端口
+        host: 监听地址（默认仅本机）
+
+    Returns:
+        HTTP服务对象，启动失败时返回None
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body = registry.render_prometheus().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body = json.dumps(registry.snapshot(), ensure_ascii=False).encode('utf-8')
+                content_type = 'application/json; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("metrics: " + format, *args)
+
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        logger.warning("启动指标服务失败: %s", e)
+        return None
+
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    logger.info("指标服务已启动: http://%s:%d/metrics", host, port)
+    return server
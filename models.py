@@ -1,9 +1,9 @@
 """
 数据模型模块
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 
 @dataclass
@@ -48,3 +48,23 @@ class Paper:
             <p style="color: #666;"><em>{self.abstract[:300]}...</em></p>
         </div>
         """
+
+
+@dataclass
+class DigestGroup:
+    """汇总中的一组论文（按分类或主题分组）"""
+    name: str
+    count: int  # 该组在统计周期内的论文总数
+    papers: List[Paper] = field(default_factory=list)  # 排名靠前的论文
+
+
+@dataclass
+class Digest:
+    """周报/月报汇总"""
+    title: str  # 如"周报"、"月报"
+    topic: Optional[str]  # 为None表示全部主题
+    start: datetime
+    end: datetime
+    total: int  # 统计周期内的论文总数
+    group_count: int  # 分组总数（groups只包含展示的分组）
+    groups: List[DigestGroup] = field(default_factory=list)
@@ -0,0 +1,201 @@
+"""
+性能剖析模块
+
+支持cProfile（输出pstats文件）和采样剖析（输出折叠栈文件，可直接用于火焰图工具），
+并在每次剖析结束后输出各阶段的墙钟时间/CPU时间表。
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('sampling', 'cprofile')
+
+
+class StackSampler:
+    """采样剖析器：定期采集目标线程的调用栈"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        初始化采样剖析器
+
+        Args:
+            thread_id: 被采样的线程ID
+            interval: 采样间隔（秒）
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: StackCounter = StackCounter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """开始采样"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止采样"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def write_collapsed(self, path: str):
+        """
+        以折叠栈格式写入采样结果（兼容flamegraph.pl、speedscope等工具）
+
+        Args:
+            path: 输出文件路径
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+def _stage_totals() -> Dict[str, Tuple[float, float, float]]:
+    """获取各阶段累计的(次数, 自身墙钟时间, 自身CPU时间)，嵌套的子阶段不重复计入"""
+    calls = metrics.STAGE_SECONDS.snapshot()
+    wall = metrics.STAGE_SELF_SECONDS.snapshot()
+    cpu = metrics.STAGE_SELF_CPU_SECONDS.snapshot()
+    totals = {
+        stage: (values['count'], wall.get(stage, 0.0), cpu.get(stage, 0.0))
+        for stage, values in calls.items()
+    }
+    # 频率限制等待不占用CPU，单独作为一个阶段列出
+    wait = metrics.RATE_LIMIT_WAIT.snapshot().get('_')
+    if wait:
+        totals['rate_limit_wait'] = (wait['count'], wait['sum'], 0.0)
+    return totals
+
+
+def format_stage_table(before: Dict[str, Tuple[float, float, float]],
+                       after: Dict[str, Tuple[float, float, float]],
+                       total_wall: float, total_cpu: float) -> str:
+    """
+    生成各阶段耗时表（各阶段只统计自身耗时，占比之和不超过100%）
+
+    Args:
+        before: 运行前的阶段累计值
+        after: 运行后的阶段累计值
+        total_wall: 本次运行的总墙钟时间
+        total_cpu: 本次运行在被剖析线程上的总CPU时间
+
+    Returns:
+        格式化后的表格文本
+    """
+    rows: List[Tuple[str, int, float, float]] = []
+    for stage, (count, wall, cpu) in after.items():
+        prev_count, prev_wall, prev_cpu = before.get(stage, (0, 0.0, 0.0))
+        if count - prev_count <= 0:
+            continue
+        rows.append((stage, int(count - prev_count), wall - prev_wall, cpu - prev_cpu))
+    rows.sort(key=lambda row: row[2], reverse=True)
+
+    header = f"{'阶段':<16}{'次数':>8}{'墙钟(s)':>12}{'CPU(s)':>12}{'等待(s)':>12}{'占比':>8}"
+    lines = [header, '-' * len(header)]
+    for stage, count, wall, cpu in rows:
+        share = wall / total_wall * 100 if total_wall > 0 else 0.0
+        lines.append(f'{stage:<16}{count:>8}{wall:>12.3f}{cpu:>12.3f}{max(wall - cpu, 0.0):>12.3f}{share:>7.1f}%')
+    lines.append('-' * len(header))
+    lines.append(f"{'总计':<16}{'':>8}{total_wall:>12.3f}{total_cpu:>12.3f}{max(total_wall - total_cpu, 0.0):>12.3f}")
+    return '\n'.join(lines)
+
+
+class RunProfiler:
+    """任务剖析器：按采样比例剖析任务运行"""
+
+    def __init__(self, mode: str = 'sampling', output_dir: str = 'profiles',
+                 sample_rate: float = 1.0, interval: float = 0.005):
+        """
+        初始化任务剖析器
+
+        Args:
+            mode: 剖析方式，sampling（采样，开销低）或cprofile（确定性剖析）
+            output_dir: 剖析结果输出目录
+            sample_rate: 被剖析的任务比例（0~1）
+            interval: 采样间隔（秒），仅sampling方式使用
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的剖析方式: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def should_profile(self) -> bool:
+        """判断本次任务是否需要剖析"""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def run(self, func: Callable[[], Any], label: str = 'run') -> Any:
+        """
+        执行任务，按采样比例进行剖析
+
+        Args:
+            func: 任务函数
+            label: 输出文件名前缀
+
+        Returns:
+            任务函数的返回值
+        """
+        if not self.should_profile():
+            return func()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        before = _stage_totals()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()  # 与各阶段一致，只统计被剖析线程（不含采样线程）
+
+        if self.mode == 'cprofile':
+            import cProfile
+
+            profile = cProfile.Profile()
+            path = os.path.join(self.output_dir, f'{label}-{stamp}.pstats')
+            profile.enable()
+            try:
+                return func()
+            finally:
+                profile.disable()
+                profile.dump_stats(path)
+                self._report(before, wall_start, cpu_start, path)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            path = os.path.join(self.output_dir, f'{label}-{stamp}.collapsed')
+            sampler.start()
+            try:
+                return func()
+            finally:
+                sampler.stop()
+                sampler.write_collapsed(path)
+                self._report(before, wall_start, cpu_start, path)
+
+    def _report(self, before: Dict[str, Tuple[float, float, float]],
+                wall_start: float, cpu_start: float, path: str):
+        """输出各阶段耗时表"""
+        total_wall = time.perf_counter() - wall_start
+        total_cpu = time.thread_time() - cpu_start
+        table = format_stage_table(before, _stage_totals(), total_wall, total_cpu)
+        logger.info("剖析结果已写入: %s\n%s", path, table)
@@ -0,0 +1,126 @@
+"""
+周报/月报汇总模块
+
+只读取本地存档生成周期汇总，不发出任何arXiv请求，也不会修改已发送记录，
+与每日推送的去重互不影响。存档按发布时间范围流式读取，每组只保留排名靠前的论文，
+内存占用与统计周期内的论文数无关。
+"""
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+from config import Config
+from db_manager import DatabaseManager, normalize_author
+from models import Digest, DigestGroup, Paper
+
+logger = logging.getLogger(__name__)
+
+# 汇总周期：(天数, 标题)
+ROLLUP_PERIODS = {
+    'weekly': (7, '周报'),
+    'monthly': (30, '月报'),
+}
+ROLLUP_GROUPINGS = ('category', 'topic')
+
+
+class RollupDigest:
+    """周报/月报汇总生成器"""
+
+    def __init__(self, period: str = 'weekly', group_by: str = 'category', topic: Optional[str] = None,
+                 categories: Optional[List[str]] = None, watch_authors: Optional[List[str]] = None,
+                 per_group: int = 0, max_groups: int = 0):
+        """
+        初始化汇总生成器
+
+        Args:
+            period: 汇总周期，weekly或monthly
+            group_by: 分组方式，category（按主分类）或topic（按爬取主题）
+            topic: 只汇总该主题的论文（默认汇总全部主题）
+            categories: 只汇总这些分类的论文（默认为DIGEST_CATEGORIES，为空表示不过滤）
+            watch_authors: 关注的作者，其论文在组内排在前面（默认为WATCH_AUTHORS）
+            per_group: 每组展示的论文数（默认为ROLLUP_PER_GROUP）
+            max_groups: 最多展示的分组数（默认为ROLLUP_MAX_GROUPS）
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"不支持的汇总周期: {period}")
+        if group_by not in ROLLUP_GROUPINGS:
+            raise ValueError(f"不支持的分组方式: {group_by}")
+        self.period = period
+        self.group_by = group_by
+        self.topic = topic
+        self.categories = Config.DIGEST_CATEGORIES if categories is None else categories
+        watch_authors = Config.WATCH_AUTHORS if watch_authors is None else watch_authors
+        self.watch_keys = {normalize_author(author) for author in watch_authors}
+        self.per_group = per_group or Config.ROLLUP_PER_GROUP
+        self.max_groups = max_groups or Config.ROLLUP_MAX_GROUPS
+        self.db = DatabaseManager()
+
+    def _group_of(self, topic: Optional[str], paper: Paper) -> Optional[str]:
+        """确定论文所属分组，不在关注分类中的论文返回None"""
+        if self.categories:
+            category = next((c for c in paper.categories if c in self.categories), None)
+            if category is None:
+                return None
+        else:
+            category = paper.categories[0] if paper.categories else '未分类'
+        if self.group_by == 'topic':
+            return topic or '未知主题'
+        return category
+
+    def _score(self, paper: Paper) -> Tuple[bool, datetime]:
+        """组内排名：关注作者的论文优先，其次按发布时间从新到旧"""
+        watched = bool(self.watch_keys) and any(
+            normalize_author(author) in self.watch_keys for author in paper.authors)
+        return watched, paper.published
+
+    def build(self, end: Optional[datetime] = None) -> Digest:
+        """
+        生成汇总
+
+        Args:
+            end: 统计周期的结束时间（默认为当前时间）
+
+        Returns:
+            汇总结果，分组按论文数从多到少排列
+        """
+        days, title = ROLLUP_PERIODS[self.period]
+        end = end or datetime.now()
+        start = end - timedelta(days=days)
+
+        counts: Dict[str, int] = {}
+        # 每组一个大小不超过per_group的小顶堆，堆顶为组内排名最低的论文
+        tops: Dict[str, List[Tuple[Tuple[bool, datetime], str, Paper]]] = {}
+        total = 0
+        with metrics.timed('db_load'):
+            for topic, paper in self.db.iter_papers(start, end, self.topic):
+                group = self._group_of(topic, paper)
+                if group is None:
+                    continue
+                total += 1
+                counts[group] = counts.get(group, 0) + 1
+                item = (self._score(paper), paper.arxiv_id, paper)
+                heap = tops.setdefault(group, [])
+                if len(heap) < self.per_group:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:  # arxiv_id唯一，比较不会落到论文对象上
+                    heapq.heapreplace(heap, item)
+
+        names = sorted(counts, key=lambda name: (-counts[name], name))[:self.max_groups]
+        groups = [DigestGroup(name, counts[name], [item[2] for item in sorted(tops[name], reverse=True)])
+                  for name in names]
+        logger.info("%s汇总 %s ~ %s: 共 %d 篇论文，%d 个分组（展示 %d 个）", title,
+                    start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), total, len(counts), len(groups))
+        return Digest(title, self.topic, start, end, total, len(counts), groups)
+
+    def send(self) -> bool:
+        """
+        生成并发送汇总邮件
+
+        Returns:
+            是否发送成功
+        """
+        from email_notifier import EmailNotifier
+
+        return EmailNotifier().send_digest(self.build())
@@ -1,39 +1,56 @@
 """
 定时任务调度模块
 """
+import logging
 import time
-import schedule
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 from crawler import ArxivCrawler
 from email_notifier import EmailNotifier
+import metrics
 from config import Config
 
+if TYPE_CHECKING:
+    from profiler import RunProfiler
+
+logger = logging.getLogger(__name__)
+
 
 class PaperScheduler:
     """论文爬取调度器"""
 
-    def __init__(self, topic: Optional[str] = None):
+    def __init__(self, topic: Optional[str] = None, profiler: Optional['RunProfiler'] = None,
+                 categories: Optional[List[str]] = None, watch_authors: Optional[List[str]] = None):
         """
         初始化调度器
 
         Args:
             topic: 爬取主题
+            profiler: 任务剖析器（为None时不剖析）
+            categories: 只发送这些分类的论文（默认为DIGEST_CATEGORIES）
+            watch_authors: 关注的作者（默认为WATCH_AUTHORS）
         """
         self.topic = topic or Config.DEFAULT_TOPIC
-        self.crawler = ArxivCrawler(self.topic)
+        self.crawler = ArxivCrawler(self.topic, categories, watch_authors)
         self.notifier = EmailNotifier()
+        self.profiler = profiler
         self.is_running = False
 
     def crawl_and_notify(self):
         """爬取并发送通知"""
+        if self.profiler:
+            self.profiler.run(self._crawl_and_notify, label='crawl_and_notify')
+        else:
+            self._crawl_and_notify()
+
+    def _crawl_and_notify(self):
+        """爬取并发送通知（实际执行逻辑）"""
+        status = 'error'
+        papers_to_send = []
         try:
-            print(f"\n{'='*50}")
-            print(f"开始执行任务: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"主题: {self.topic}")
-            print(f"目标: 获取 {Config.MAX_PAPERS_PER_DAY} 篇新论文")
-            print(f"最大轮数: {Config.MAX_CRAWL_ROUNDS}")
-            print(f"{'='*50}\n")
+            logger.info("开始执行任务: %s | 主题: %s | 目标: 获取 %d 篇新论文 | 最大轮数: %d",
+                        datetime.now().strftime('%Y-%m-%d %H:%M:%S'), self.topic,
+                        Config.MAX_PAPERS_PER_DAY, Config.MAX_CRAWL_ROUNDS)
 
             # 循环爬取直到达到目标数量或最大轮数
             new_papers = self.crawler.crawl_until_enough(
@@ -41,14 +58,22 @@ class PaperScheduler:
                 max_rounds=Config.MAX_CRAWL_ROUNDS
             )
 
+            metrics.PAPERS_PER_RUN.observe(len(new_papers))
+
             if not new_papers:
-                print("没有新论文需要发送")
+                logger.info("没有新论文需要发送")
+                status = 'empty'
                 return
 
-            # 只发送前N篇新论文（N = MAX_PAPERS_PER_DAY）
-            papers_to_send = new_papers[:Config.MAX_PAPERS_PER_DAY]
+            # 认领前N篇新论文（N = MAX_PAPERS_PER_DAY），同一进程中的其他任务不会再发送它们
+            papers_to_send = self.crawler.claim_papers(new_papers, limit=Config.MAX_PAPERS_PER_DAY)
+
+            if not papers_to_send:
+                logger.info("新论文已被其他任务发送")
+                status = 'empty'
+                return
 
-            print(f"\n准备发送前 {len(papers_to_send)} 篇新论文...")
+            logger.info("准备发送前 %d 篇新论文...", len(papers_to_send))
 
             # 发送邮件
             success = self.notifier.send_email(papers_to_send, self.topic)
@@ -56,12 +81,24 @@ class PaperScheduler:
             if success:
                 # 标记论文为已发送
                 self.crawler.mark_papers_sent(papers_to_send)
-                print("\n任务执行成功！")
+                metrics.PAPERS_SENT.inc(len(papers_to_send))
+                status = 'success'
+                logger.info("任务执行成功！")
             else:
-                print("\n任务执行失败！")
+                status = 'failed'
+                logger.error("任务执行失败！")
 
         except Exception as e:
-            print(f"任务执行出错: {str(e)}")
+            logger.exception("任务执行出错: %s", e)
+        finally:
+            if status != 'success':
+                # 未能发送的论文释放认领，供后续任务重新发送
+                self.crawler.release_papers(papers_to_send)
+            # 任务结束时立即写回发送记录，不依赖定时写回或进程正常退出
+            self.crawler.dedup.flush()
+            metrics.RUNS.inc(status=status)
+            if Config.METRICS_JSON_FILE:
+                metrics.registry.dump_json(Config.METRICS_JSON_FILE)
 
     def start_daily_schedule(self, time_str: str = "09:00"):
         """
@@ -70,9 +107,10 @@ class PaperScheduler:
         Args:
             time_str: 执行时间，格式为"HH:MM"
         """
-        print(f"调度器已启动，将在每天 {time_str} 执行爬取任务")
-        print(f"爬取主题: {self.topic}")
-        print("按 Ctrl+C 停止调度器\n")
+        logger.info("调度器已启动，将在每天 %s 执行爬取任务", time_str)
+        logger.info("爬取主题: %s（按 Ctrl+C 停止调度器）", self.topic)
+
+        import schedule
 
         # 设置定时任务
         schedule.every().day.at(time_str).do(self.crawl_and_notify)
@@ -85,13 +123,14 @@ class PaperScheduler:
                 time.sleep(60)  # 每分钟检查一次
 
         except KeyboardInterrupt:
-            print("\n调度器已停止")
+            logger.info("调度器已停止")
 
     def start_hourly_schedule(self):
         """启动每小时定时任务"""
-        print(f"调度器已启动，将每小时执行一次爬取任务")
-        print(f"爬取主题: {self.topic}")
-        print("按 Ctrl+C 停止调度器\n")
+        logger.info("调度器已启动，将每小时执行一次爬取任务")
+        logger.info("爬取主题: %s（按 Ctrl+C 停止调度器）", self.topic)
+
+        import schedule
 
         # 设置定时任务
         schedule.every().hour.do(self.crawl_and_notify)
@@ -104,7 +143,7 @@ class PaperScheduler:
                 time.sleep(60)
 
         except KeyboardInterrupt:
-            print("\n调度器已停止")
+            logger.info("调度器已停止")
 
     def start_interval_schedule(self, minutes: int = 30):
         """
@@ -113,9 +152,10 @@ class PaperScheduler:
         Args:
             minutes: 间隔分钟数
         """
-        print(f"调度器已启动，将每 {minutes} 分钟执行一次爬取任务")
-        print(f"爬取主题: {self.topic}")
-        print("按 Ctrl+C 停止调度器\n")
+        logger.info("调度器已启动，将每 %d 分钟执行一次爬取任务", minutes)
+        logger.info("爬取主题: %s（按 Ctrl+C 停止调度器）", self.topic)
+
+        import schedule
 
         # 设置定时任务
         schedule.every(minutes).minutes.do(self.crawl_and_notify)
@@ -128,7 +168,7 @@ class PaperScheduler:
                 time.sleep(60)
 
         except KeyboardInterrupt:
-            print("\n调度器已停止")
+            logger.info("调度器已停止")
 
     def run_once(self):
         """执行一次爬取任务"""